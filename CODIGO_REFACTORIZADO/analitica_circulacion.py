@@ -0,0 +1,194 @@
+"""
+ANALITICA DE CIRCULACION
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class _Cubeta:
+    """
+    Autores con la misma cantidad de prestamos, enlazada con las cubetas
+    vecinas no vacias.
+    """
+    __slots__ = ("conteo", "autores", "menor", "mayor")
+
+    def __init__(self, conteo: int):
+        self.conteo = conteo
+        self.autores: Dict[str, None] = {}
+        self.menor: Optional["_Cubeta"] = None
+        self.mayor: Optional["_Cubeta"] = None
+
+
+class RankingAutores:
+    """
+    Conteo de prestamos por autor con consulta de los k primeros en O(k).
+
+    Los autores se agrupan en cubetas por conteo, enlazadas en orden y sin
+    cubetas vacias. Sumar un prestamo mueve al autor a la cubeta siguiente
+    en O(1); el ranking se lee desde la cubeta mayor hacia abajo.
+    """
+    def __init__(self):
+        """
+        Inicializa el ranking vacio.
+        """
+        self._cubeta_de: Dict[str, _Cubeta] = {}
+        self._cubeta_menor: Optional[_Cubeta] = None
+        self._cubeta_mayor: Optional[_Cubeta] = None
+
+    def __len__(self) -> int:
+        return len(self._cubeta_de)
+
+    def incrementar(self, autor: str) -> None:
+        """
+        Suma un prestamo al autor.
+        """
+        actual = self._cubeta_de.get(autor)
+        conteo = actual.conteo + 1 if actual else 1
+        anterior = actual
+
+        siguiente = actual.mayor if actual else self._cubeta_menor
+        if siguiente is None or siguiente.conteo != conteo:
+            nueva = _Cubeta(conteo)
+            self._enlazar(nueva, anterior, siguiente)
+            siguiente = nueva
+
+        siguiente.autores[autor] = None
+        self._cubeta_de[autor] = siguiente
+
+        if actual:
+            del actual.autores[autor]
+            if not actual.autores:
+                self._desenlazar(actual)
+
+    def conteo(self, autor: str) -> int:
+        """Prestamos acumulados por el autor."""
+        cubeta = self._cubeta_de.get(autor)
+        return cubeta.conteo if cubeta else 0
+
+    def primeros(self, k: int) -> List[Tuple[str, int]]:
+        """
+        Los k autores con mas prestamos, de mayor a menor. Los empates se
+        ordenan por el primero en alcanzar ese conteo.
+        """
+        resultado = []
+        cubeta = self._cubeta_mayor
+        while cubeta and len(resultado) < k:
+            for autor in cubeta.autores:
+                resultado.append((autor, cubeta.conteo))
+                if len(resultado) == k:
+                    break
+            cubeta = cubeta.menor
+        return resultado
+
+    def _enlazar(self, cubeta: _Cubeta, menor: Optional[_Cubeta], mayor: Optional[_Cubeta]) -> None:
+        """Inserta la cubeta entre dos vecinas."""
+        cubeta.menor, cubeta.mayor = menor, mayor
+        if menor:
+            menor.mayor = cubeta
+        else:
+            self._cubeta_menor = cubeta
+        if mayor:
+            mayor.menor = cubeta
+        else:
+            self._cubeta_mayor = cubeta
+
+    def _desenlazar(self, cubeta: _Cubeta) -> None:
+        """Quita una cubeta vacia de la lista."""
+        if cubeta.menor:
+            cubeta.menor.mayor = cubeta.mayor
+        else:
+            self._cubeta_menor = cubeta.mayor
+        if cubeta.mayor:
+            cubeta.mayor.menor = cubeta.menor
+        else:
+            self._cubeta_mayor = cubeta.menor
+
+
+class AnaliticaCirculacion:
+    """
+    Agregados de circulacion actualizados en cada prestamo y devolucion.
+
+    Mantiene prestamos por dia, ranking de autores, prestamos activos y la
+    suma de duraciones de los prestamos devueltos, de modo que cada consulta
+    cuesta O(1), o O(k) para el ranking, sin recorrer los prestamos.
+    """
+    def __init__(self):
+        """
+        Inicializa los agregados vacios.
+        """
+        self.limpiar()
+
+    def limpiar(self) -> None:
+        """
+        Descarta todos los agregados.
+        """
+        self._prestamos_por_dia: Dict[str, int] = {}
+        self.ranking_autores = RankingAutores()
+        self.total_prestamos = 0
+        self.prestamos_activos = 0
+        self.devoluciones_con_duracion = 0
+        self.dias_prestados = 0
+
+    def registrar_prestamo(self, prestamo: Any, autor: Optional[str]) -> None:
+        """
+        Suma un prestamo nuevo a los agregados.
+        """
+        self.total_prestamos += 1
+        self.prestamos_activos += 1
+        if isinstance(prestamo.fecha, str):
+            self._prestamos_por_dia[prestamo.fecha] = self._prestamos_por_dia.get(prestamo.fecha, 0) + 1
+        if autor:
+            self.ranking_autores.incrementar(autor)
+
+    def registrar_devolucion(self, prestamo: Any) -> None:
+        """
+        Actualiza los agregados con la devolucion de un prestamo.
+        """
+        self.prestamos_activos -= 1
+        self._sumar_duracion(prestamo)
+
+    def reconstruir(self, prestamos: Iterable[Any], autor_de_libro: Dict[int, str]) -> None:
+        """
+        Recalcula todos los agregados a partir del historial completo.
+
+        Args:
+            prestamos: Todos los prestamos, devueltos y activos
+            autor_de_libro: Autor por ID de libro
+        """
+        self.limpiar()
+        for prestamo in prestamos:
+            self.registrar_prestamo(prestamo, autor_de_libro.get(prestamo.libro_id))
+            if prestamo.devuelto:
+                self.registrar_devolucion(prestamo)
+
+    def prestamos_en_dia(self, fecha: str) -> int:
+        """Prestamos realizados en la fecha "%Y-%m-%d" indicada."""
+        return self._prestamos_por_dia.get(fecha, 0)
+
+    def autores_mas_prestados(self, k: int = 10) -> List[Tuple[str, int]]:
+        """Los k autores con mas prestamos."""
+        return self.ranking_autores.primeros(k)
+
+    def tasa_utilizacion(self, total_libros: int) -> float:
+        """Fraccion del catalogo prestada en este momento."""
+        return self.prestamos_activos / total_libros if total_libros else 0.0
+
+    def duracion_promedio(self) -> float:
+        """Dias promedio entre prestamo y devolucion de los prestamos devueltos."""
+        if not self.devoluciones_con_duracion:
+            return 0.0
+        return self.dias_prestados / self.devoluciones_con_duracion
+
+    def _sumar_duracion(self, prestamo: Any) -> None:
+        """
+        Acumula la duracion de un prestamo devuelto si ambas fechas son
+        validas; los registros antiguos sin fecha de devolucion no cuentan.
+        """
+        try:
+            inicio = date.fromisoformat(prestamo.fecha)
+            fin = date.fromisoformat(prestamo.fecha_devolucion)
+        except (TypeError, ValueError):
+            return
+        self.dias_prestados += (fin - inicio).days
+        self.devoluciones_con_duracion += 1
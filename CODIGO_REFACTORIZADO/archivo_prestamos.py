@@ -0,0 +1,153 @@
+"""
+ARCHIVO HISTORICO DE PRESTAMOS
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class ArchivoPrestamos:
+    """
+    Almacen en disco, solo de agregado, para prestamos ya devueltos.
+
+    Los registros se agregan como JSON Lines al segmento activo. Cuando este
+    alcanza registros_por_segmento se sella: se reescribe comprimido con gzip
+    y se abre un segmento nuevo. Los segmentos sellados no vuelven a
+    modificarse, por lo que el historial puede crecer sin afectar la memoria
+    ni el arranque del sistema, que solo conserva prestamos activos.
+    """
+    def __init__(self, directorio: str = "historial_prestamos", registros_por_segmento: int = 10000):
+        """
+        Inicializa el archivo historico en el directorio indicado.
+
+        Args:
+            directorio: Carpeta donde se guardan los segmentos
+            registros_por_segmento: Registros que admite un segmento antes de sellarse
+        """
+        self.directorio = directorio
+        self.registros_por_segmento = registros_por_segmento
+        os.makedirs(self.directorio, exist_ok=True)
+        self._descartar_segmentos_ya_sellados()
+
+        activos = self._segmentos(".jsonl")
+        if activos:
+            self._numero_activo = self._numero_segmento(activos[-1])
+            self._registros_activo = self._contar_lineas(activos[-1])
+        else:
+            sellados = self._segmentos(".jsonl.gz")
+            self._numero_activo = self._numero_segmento(sellados[-1]) + 1 if sellados else 1
+            self._registros_activo = 0
+
+    def archivar(self, prestamo: Any) -> bool:
+        """
+        Agrega un prestamo devuelto al segmento activo.
+        """
+        try:
+            linea = json.dumps(self._prestamo_a_dict(prestamo), ensure_ascii=False, separators=(",", ":"))
+            with open(self._ruta_activo(), 'a', encoding='utf-8') as f:
+                f.write(linea + "\n")
+
+            self._registros_activo += 1
+            if self._registros_activo >= self.registros_por_segmento:
+                self._sellar_segmento_activo()
+            return True
+        except Exception as e:
+            print(f"Error al archivar prestamo: {e}")
+            return False
+
+    def iterar(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre el historial completo, del segmento mas antiguo al activo,
+        leyendo un registro a la vez.
+        """
+        for ruta in sorted(self._segmentos(".jsonl.gz") + self._segmentos(".jsonl"),
+                           key=self._numero_segmento):
+            abrir = gzip.open if ruta.endswith(".gz") else open
+            with abrir(ruta, 'rt', encoding='utf-8') as f:
+                for linea in f:
+                    if linea.strip():
+                        yield json.loads(linea)
+
+    def buscar_por_id(self, prestamo_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Busca un prestamo archivado por su ID recorriendo el historial.
+        """
+        for registro in self.iterar():
+            if registro["id"] == prestamo_id:
+                return registro
+        return None
+
+    def obtener_info(self) -> Dict[str, Any]:
+        """
+        Obtiene informacion sobre los segmentos del historial.
+        """
+        return {
+            "tipo": "archivo_prestamos",
+            "directorio": self.directorio,
+            "segmentos_sellados": len(self._segmentos(".jsonl.gz")),
+            "registros_segmento_activo": self._registros_activo
+        }
+
+    def _sellar_segmento_activo(self) -> None:
+        """
+        Comprime el segmento activo y abre uno nuevo. El original se borra
+        solo despues de escribir completamente la version comprimida.
+        """
+        ruta = self._ruta_activo()
+        temporal = ruta + ".gz.tmp"
+        with open(ruta, 'rb') as origen, gzip.open(temporal, 'wb') as destino:
+            destino.writelines(origen)
+        os.replace(temporal, ruta + ".gz")
+        os.remove(ruta)
+
+        self._numero_activo += 1
+        self._registros_activo = 0
+
+    def _descartar_segmentos_ya_sellados(self) -> None:
+        """
+        Borra segmentos sin comprimir cuya version comprimida ya existe,
+        restos de un sellado interrumpido antes de borrar el original.
+        """
+        for ruta in self._segmentos(".jsonl"):
+            if os.path.exists(ruta + ".gz"):
+                os.remove(ruta)
+
+    def _ruta_activo(self) -> str:
+        """Ruta del segmento que recibe nuevos registros."""
+        return os.path.join(self.directorio, f"segmento_{self._numero_activo:06d}.jsonl")
+
+    def _segmentos(self, extension: str) -> List[str]:
+        """Rutas de los segmentos con la extension dada, en orden."""
+        return sorted(
+            os.path.join(self.directorio, nombre)
+            for nombre in os.listdir(self.directorio)
+            if nombre.startswith("segmento_") and nombre.endswith(extension)
+        )
+
+    @staticmethod
+    def _numero_segmento(ruta: str) -> int:
+        """Numero de secuencia de un segmento a partir de su nombre."""
+        return int(os.path.basename(ruta)[len("segmento_"):].split(".")[0])
+
+    @staticmethod
+    def _contar_lineas(ruta: str) -> int:
+        """Cantidad de registros en un segmento sin comprimir."""
+        with open(ruta, 'rb') as f:
+            return sum(1 for linea in f if linea.strip())
+
+    def _prestamo_a_dict(self, prestamo: Any) -> Dict[str, Any]:
+        """
+        Convierte un objeto prestamo a diccionario.
+        """
+        return {
+            "id": prestamo.id,
+            "libro_id": prestamo.libro_id,
+            "usuario": prestamo.usuario,
+            "devuelto": prestamo.devuelto,
+            "fecha": prestamo.fecha,
+            "fecha_vencimiento": prestamo.fecha_vencimiento,
+            "recordatorio_enviado": prestamo.recordatorio_enviado,
+            "fecha_devolucion": prestamo.fecha_devolucion
+        }
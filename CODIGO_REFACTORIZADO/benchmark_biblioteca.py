@@ -0,0 +1,142 @@
+"""
+BENCHMARKS DEL SISTEMA DE BIBLIOTECA
+"""
+
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from biblioteca import Libro
+from busqueda import Busqueda
+from validador_biblioteca import ValidadorBiblioteca
+
+_SILABAS = ["ma", "ri", "so", "le", "dad", "cien", "an", "tor", "gar", "cia",
+            "mar", "quez", "prin", "ci", "pi", "to", "or", "well", "sa", "ber"]
+
+
+def _palabra(aleatorio: random.Random) -> str:
+    """Genera una palabra pronunciable a partir de silabas."""
+    return "".join(aleatorio.choices(_SILABAS, k=aleatorio.randint(2, 4))).capitalize()
+
+
+def generar_isbn13(numero: int) -> str:
+    """
+    Genera un ISBN-13 con prefijo 978 y digito de control correcto.
+    """
+    base = f"978{numero % 10**9:09d}"
+    suma = sum((3 if i % 2 else 1) * int(d) for i, d in enumerate(base))
+    return f"{base}{(10 - suma % 10) % 10}"
+
+
+def generar_catalogo(cantidad: int, semilla: int = 42) -> List[Libro]:
+    """
+    Genera un catalogo sintetico de libros reproducible.
+    """
+    aleatorio = random.Random(semilla)
+    autores = [f"{_palabra(aleatorio)} {_palabra(aleatorio)}" for _ in range(max(1, cantidad // 20))]
+    return [
+        Libro(
+            i,
+            " ".join(_palabra(aleatorio) for _ in range(aleatorio.randint(1, 4))),
+            aleatorio.choice(autores),
+            generar_isbn13(i)
+        )
+        for i in range(1, cantidad + 1)
+    ]
+
+
+def _percentiles(muestras: List[float]) -> Dict[str, float]:
+    """
+    Resume muestras de latencia (en segundos) como microsegundos.
+    """
+    ordenadas = sorted(muestras)
+    return {
+        "p50_us": ordenadas[len(ordenadas) // 2] * 1e6,
+        "p99_us": ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))] * 1e6,
+        "media_us": statistics.fmean(ordenadas) * 1e6
+    }
+
+
+def _latencias_por_tecla(textos: List[str], consulta: Callable[[str], object]) -> List[float]:
+    """
+    Simula a un usuario escribiendo cada texto tecla por tecla y mide la
+    latencia de la consulta en cada pulsacion.
+    """
+    muestras = []
+    for texto in textos:
+        for fin in range(1, len(texto) + 1):
+            inicio = time.perf_counter()
+            consulta(texto[:fin])
+            muestras.append(time.perf_counter() - inicio)
+    return muestras
+
+
+def medir_autocompletado(cantidad: int = 100_000, consultas: int = 50) -> Dict[str, Dict[str, float]]:
+    """
+    Compara la latencia por pulsacion del autocompletado por prefijo con la
+    busqueda por subcadena que se usaba en cada tecla.
+    """
+    libros = generar_catalogo(cantidad)
+    busqueda = Busqueda()
+    busqueda.reconstruir_indices(libros)
+    busqueda.autocompletar("titulo", libros, "a")
+
+    aleatorio = random.Random(7)
+    textos = [aleatorio.choice(libros).titulo[:12] for _ in range(consultas)]
+
+    return {
+        "autocompletar_titulo": _percentiles(_latencias_por_tecla(
+            textos, lambda prefijo: busqueda.autocompletar("titulo", libros, prefijo, 10))),
+        "subcadena_titulo": _percentiles(_latencias_por_tecla(
+            textos[:5], lambda prefijo: busqueda.buscar("titulo", libros, prefijo)))
+    }
+
+
+def medir_validacion(cantidad: int = 100_000) -> Dict[str, Dict[str, float]]:
+    """
+    Mide el rendimiento en filas por segundo de la validacion en lote
+    frente a validar libro por libro.
+    """
+    filas = [
+        {"titulo": libro.titulo, "autor": libro.autor, "isbn": libro.isbn}
+        for libro in generar_catalogo(cantidad)
+    ]
+    for fila in filas[::10]:
+        fila["isbn"] = fila["isbn"][:-1] + "X"
+
+    inicio = time.perf_counter()
+    invalidas = sum(1 for _, errores in ValidadorBiblioteca.validar_lote(filas) if errores)
+    lote = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for fila in filas:
+        ValidadorBiblioteca.validar_libro(fila["titulo"], fila["autor"], fila["isbn"])
+    individual = time.perf_counter() - inicio
+
+    return {
+        "validar_lote": {"filas_por_segundo": cantidad / lote, "filas_invalidas": invalidas},
+        "validar_libro": {"filas_por_segundo": cantidad / individual}
+    }
+
+
+def _imprimir(titulo: str, resultados: Dict[str, Dict[str, float]]) -> None:
+    """Imprime un bloque de resultados."""
+    print(f"\n=== {titulo} ===")
+    for nombre, metricas in resultados.items():
+        detalle = " | ".join(f"{clave}: {valor:,.1f}" for clave, valor in metricas.items())
+        print(f"- {nombre}: {detalle}")
+
+
+def main(cantidad: int):
+    """
+    Ejecuta todos los benchmarks sobre un catalogo sintetico.
+    """
+    print(f"Catalogo sintetico de {cantidad:,} libros")
+    _imprimir("LATENCIA POR PULSACION", medir_autocompletado(cantidad))
+    _imprimir("VALIDACION EN LOTE", medir_validacion(cantidad))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -3,13 +3,53 @@ EXAMEN PRINCIPIOS SOLID - 2 HORAS
 Sistema de Mini-Biblioteca
 """
 
-from dataclasses import dataclass
+import functools
+import itertools
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Optional
 from busqueda import Busqueda
 from validador_biblioteca import ValidadorBiblioteca
 from irepositorio import IRepositorio
 from servicio_notificaciones import ServicioNotificaciones
 from repositorio_archivo import RepositorioArchivo
 from repositorio_memoria import RepositorioMemoria
+from archivo_prestamos import ArchivoPrestamos
+from planificador_recordatorios import PlanificadorRecordatorios
+from internado_cadenas import InternadorCadenas
+from vistas import VistaFiltrada, VistaSoloLectura
+from exportador import CAMPOS_LIBRO, CAMPOS_PRESTAMO, exportar
+from analitica_circulacion import AnaliticaCirculacion
+from indice_fechas import IndiceFechas, a_ordinal
+from usuarios import RegistroUsuarios
+from eventos import (LibroAgregado, PrestamoRealizado, LibroDevuelto,
+                     ReservaRegistrada, ReservaCancelada, RecordatorioEnviado)
+from normalizacion import normalizar_isbn, normalizar_texto
+
+def _transaccional(metodo):
+    """
+    Ejecuta una operacion que modifica datos dentro de una transaccion del
+    repositorio, recargando antes el estado si otro proceso lo cambio.
+    """
+    @functools.wraps(metodo)
+    def envoltorio(self, *args, **kwargs):
+        with self.repositorio.transaccion():
+            self.sincronizar()
+            return metodo(self, *args, **kwargs)
+    return envoltorio
+
+def _sincronizado(metodo):
+    """
+    Incorpora antes de una consulta los cambios que otro proceso haya
+    guardado, para no responder con datos desactualizados.
+    """
+    @functools.wraps(metodo)
+    def envoltorio(self, *args, **kwargs):
+        self.sincronizar()
+        return metodo(self, *args, **kwargs)
+    return envoltorio
 
 @dataclass
 class Libro:
@@ -18,6 +58,17 @@ class Libro:
     autor: str
     isbn: str
     disponible: bool = True
+    titulo_normalizado: str = field(init=False, repr=False, compare=False)
+    autor_normalizado: str = field(init=False, repr=False, compare=False)
+    isbn_normalizado: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """
+        Calcula una sola vez las claves de busqueda normalizadas del libro.
+        """
+        self.titulo_normalizado = normalizar_texto(self.titulo)
+        self.autor_normalizado = normalizar_texto(self.autor)
+        self.isbn_normalizado = normalizar_isbn(self.isbn)
 
 @dataclass
 class Prestamo:
@@ -26,6 +77,18 @@ class Prestamo:
     usuario: str
     fecha: str
     devuelto: bool = False
+    fecha_vencimiento: Optional[str] = None
+    recordatorio_enviado: bool = False
+    fecha_devolucion: Optional[str] = None
+    dia: Optional[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """
+        Codifica la fecha del prestamo como ordinal de dia para comparar y
+        ordenar sin volver a parsear la cadena. Es None si la fecha no es
+        valida, como en registros antiguos.
+        """
+        self.dia = a_ordinal(self.fecha)
 
 class SistemaBiblioteca:
     """
@@ -35,12 +98,27 @@ class SistemaBiblioteca:
                  busqueda: Busqueda,
                  validador: ValidadorBiblioteca,
                  repositorio: IRepositorio,
-                 notificaciones: ServicioNotificaciones):
+                 notificaciones: ServicioNotificaciones,
+                 archivo_prestamos: Optional[ArchivoPrestamos] = None,
+                 dias_prestamo: int = 14,
+                 usuarios: Optional[RegistroUsuarios] = None):
         """
         Inicializa el sistema con todas sus dependencias.
+
+        Si se indica archivo_prestamos, los prestamos devueltos se mueven a
+        ese historial en disco y en memoria solo quedan los activos.
+        dias_prestamo fija el plazo de devolucion de cada prestamo nuevo.
+        usuarios define el tipo, y con el el limite de prestamos, de cada
+        usuario; los no registrados tienen el limite basico.
         """
         self.libros = []
-        self.prestamos = []
+        self._libros_por_id = {}
+        self._prestamos_por_id = {}
+        self._libros_por_isbn = {}
+        self._activos_por_usuario = {}
+        self._reservas = {}
+        self._apartados = {}
+        self._firma_catalogo = 0
         self.contador_libro = 1
         self.contador_prestamo = 1
 
@@ -48,7 +126,144 @@ class SistemaBiblioteca:
         self.validador = validador
         self.repositorio = repositorio
         self.notificaciones = notificaciones
+        self.archivo_prestamos = archivo_prestamos
+        self.dias_prestamo = dias_prestamo
+        self.usuarios = usuarios or RegistroUsuarios()
+        self.planificador = PlanificadorRecordatorios()
+        self.indice_fechas = IndiceFechas()
+        self.internador = InternadorCadenas()
+        self.analitica = AnaliticaCirculacion()
+        self._analitica_vigente = False
+        self._indices_pendientes = False
+
+        with self.repositorio.transaccion():
+            self._cargar_datos_iniciales()
+
+    @property
+    def prestamos(self):
+        """
+        Prestamos en memoria en orden de creacion. Se guardan solo en el
+        diccionario por ID, asi que archivar uno al devolverlo es O(1).
+        """
+        return self._prestamos_por_id.values()
+
+    def sincronizar(self):
+        """
+        Incorpora los cambios que otro proceso guardo en el repositorio.
+        Retorna True si los habia.
+
+        Los cambios se fusionan sobre el estado en memoria: solo se crean
+        e indexan los libros y prestamos nuevos y se actualizan los que
+        cambiaron, sin reconstruir indices de busqueda. Si el repositorio
+        informa solo lo que cambio (leer_cambios_externos) no hace falta
+        leer todos los datos. Si el repositorio perdio libros que este
+        proceso conoce (por ejemplo, tras limpiar_datos), se recarga todo.
+        """
+        if not self.repositorio.hay_cambios_externos():
+            return False
+
+        with self.repositorio.transaccion():
+            if not self.repositorio.hay_cambios_externos():
+                return False
+
+            cambios = self.repositorio.leer_cambios_externos()
+            if cambios is not None:
+                self._fusionar_datos(cambios, parcial=True)
+                return True
 
+            datos = self.repositorio.cargar_datos()
+            if not datos or not self._fusionar_datos(datos):
+                self._recargar_todo()
+            return True
+
+    def _fusionar_datos(self, datos, parcial=False):
+        """
+        Aplica sobre el estado en memoria las diferencias con los datos
+        guardados. Retorna False, sin modificar nada, si los datos no
+        contienen algun libro conocido y hace falta recargar todo.
+
+        Con parcial=True los datos solo traen lo que cambio, y los
+        prestamos que ya no estan se indican en "prestamos_quitados".
+        """
+        libros_data = datos.get('libros', ())
+        if not parcial:
+            conocidos = sum(1 for libro_data in libros_data if libro_data['id'] in self._libros_por_id)
+            if conocidos != len(self.libros):
+                return False
+
+        for libro_data in libros_data:
+            libro = self._libros_por_id.get(libro_data['id'])
+            if libro is not None:
+                libro.disponible = libro_data['disponible']
+                continue
+
+            libro = self._nuevo_libro(libro_data['id'], libro_data['titulo'], libro_data['autor'],
+                                      libro_data['isbn'], libro_data['disponible'])
+            self.libros.append(libro)
+            self._libros_por_id[libro.id] = libro
+            self._libros_por_isbn.setdefault(libro.isbn_normalizado, libro)
+            self._actualizar_firma_catalogo(libro)
+            self.busqueda.indexar_libro(libro, self.libros)
+            self._indices_pendientes = True
+
+        vigentes = set()
+        for prestamo_data in datos.get('prestamos', ()):
+            vigentes.add(prestamo_data['id'])
+            prestamo = self._prestamos_por_id.get(prestamo_data['id'])
+            if prestamo is None:
+                prestamo = self._prestamo_desde_dict(prestamo_data)
+                self._prestamos_por_id[prestamo.id] = prestamo
+                self.indice_fechas.agregar(prestamo.dia, prestamo.id)
+                if not prestamo.devuelto:
+                    self._sumar_prestamo_activo(prestamo.usuario, 1)
+                if self._requiere_recordatorio(prestamo):
+                    self.planificador.programar(prestamo.fecha_vencimiento, prestamo.id)
+                self._analitica_vigente = False
+            elif prestamo_data['devuelto'] and not prestamo.devuelto:
+                prestamo.devuelto = True
+                prestamo.fecha_devolucion = self.internador.internar(prestamo_data.get('fecha_devolucion'))
+                self._sumar_prestamo_activo(prestamo.usuario, -1)
+                self._analitica_vigente = False
+            prestamo.recordatorio_enviado = prestamo_data.get('recordatorio_enviado', False)
+
+        # Los prestamos que ya no estan los archivo otro proceso al devolverlos
+        if parcial:
+            quitados = [self._prestamos_por_id[prestamo_id] for prestamo_id in datos['prestamos_quitados']
+                        if prestamo_id in self._prestamos_por_id]
+        else:
+            quitados = [prestamo for prestamo in self.prestamos if prestamo.id not in vigentes]
+        for prestamo in quitados:
+            del self._prestamos_por_id[prestamo.id]
+            self.indice_fechas.quitar(prestamo.dia, prestamo.id)
+            if not prestamo.devuelto:
+                self._sumar_prestamo_activo(prestamo.usuario, -1)
+            self._analitica_vigente = False
+
+        self._reservas.clear()
+        self._apartados.clear()
+        self._cargar_reservas(datos.get('reservas', ()))
+
+        contadores = datos.get('contadores', {})
+        self.contador_libro = contadores.get('libro', 1)
+        self.contador_prestamo = contadores.get('prestamo', 1)
+        return True
+
+    def _recargar_todo(self):
+        """
+        Descarta el estado en memoria y lo vuelve a cargar del repositorio.
+        """
+        self.libros.clear()
+        self._libros_por_id.clear()
+        self._prestamos_por_id.clear()
+        self._libros_por_isbn.clear()
+        self._activos_por_usuario.clear()
+        self._reservas.clear()
+        self._apartados.clear()
+        self._firma_catalogo = 0
+        self._analitica_vigente = False
+        self._indices_pendientes = False
+        self.contador_libro = 1
+        self.contador_prestamo = 1
         self._cargar_datos_iniciales()
 
     def _cargar_datos_iniciales(self):
@@ -58,7 +273,7 @@ class SistemaBiblioteca:
         datos = self.repositorio.cargar_datos()
         if datos:
             for libro_data in datos.get('libros', []):
-                libro = Libro(
+                libro = self._nuevo_libro(
                     libro_data['id'],
                     libro_data['titulo'],
                     libro_data['autor'],
@@ -66,21 +281,135 @@ class SistemaBiblioteca:
                     libro_data['disponible']
                 )
                 self.libros.append(libro)
+                self._libros_por_id[libro.id] = libro
+                self._libros_por_isbn.setdefault(libro.isbn_normalizado, libro)
+                self._actualizar_firma_catalogo(libro)
 
+            prestamos_archivados = 0
             for prestamo_data in datos.get('prestamos', []):
-                prestamo = Prestamo(
-                    prestamo_data['id'],
-                    prestamo_data['libro_id'],
-                    prestamo_data['usuario'],
-                    prestamo_data['fecha'],
-                    prestamo_data['devuelto'],
-                )
-                self.prestamos.append(prestamo)
+                prestamo = self._prestamo_desde_dict(prestamo_data)
+                if prestamo.devuelto and self.archivo_prestamos:
+                    self.archivo_prestamos.archivar(prestamo)
+                    prestamos_archivados += 1
+                else:
+                    self._prestamos_por_id[prestamo.id] = prestamo
+                    if not prestamo.devuelto:
+                        self._sumar_prestamo_activo(prestamo.usuario, 1)
+
+            self._cargar_reservas(datos.get('reservas', []))
 
             contadores = datos.get('contadores', {})
             self.contador_libro = contadores.get('libro', 1)
             self.contador_prestamo = contadores.get('prestamo', 1)
 
+            if prestamos_archivados:
+                self._guardar_datos()
+
+        self.planificador.reconstruir(
+            (prestamo.fecha_vencimiento, prestamo.id)
+            for prestamo in self.prestamos
+            if self._requiere_recordatorio(prestamo)
+        )
+        self.indice_fechas.reconstruir((prestamo.dia, prestamo.id) for prestamo in self.prestamos)
+
+        self._preparar_indices()
+
+    def _cargar_reservas(self, reservas):
+        """
+        Carga colas de espera y apartados desde su forma persistida.
+        """
+        for reserva in reservas:
+            libro_id = reserva['libro_id']
+            if reserva.get('cola'):
+                self._reservas[libro_id] = deque(map(self.internador.internar, reserva['cola']))
+            if reserva.get('apartado_para'):
+                self._apartados[libro_id] = self.internador.internar(reserva['apartado_para'])
+
+    def _preparar_indices(self):
+        """
+        Carga los indices de busqueda persistidos si corresponden al catalogo
+        actual; si no, los reconstruye y quedan pendientes de persistir.
+        """
+        ruta = self.repositorio.ruta_indices()
+        if ruta and self.busqueda.cargar_indices(ruta, self._firma_indices(), self.libros):
+            return
+
+        self.busqueda.reconstruir_indices(self.libros)
+        self._indices_pendientes = True
+
+    def guardar_indices(self):
+        """
+        Punto de control de los indices de busqueda: los persiste si
+        cambiaron desde el ultimo guardado y el repositorio lo admite.
+
+        Agregar libros solo actualiza los indices en memoria y los marca
+        como pendientes, porque volcarlos cuesta lo mismo que el catalogo
+        completo. Si el proceso termina sin llamar a este metodo (o a
+        cerrar), el siguiente arranque detecta por la firma que el archivo
+        de indices esta desactualizado y los reconstruye.
+
+        Returns:
+            True si no habia cambios pendientes o se guardaron
+        """
+        if not self._indices_pendientes:
+            return True
+
+        ruta = self.repositorio.ruta_indices()
+        if ruta:
+            with self.repositorio.transaccion():
+                if not self.busqueda.guardar_indices(ruta, self._firma_indices(), self.libros):
+                    return False
+
+        self._indices_pendientes = False
+        return True
+
+    def cerrar(self):
+        """
+        Guarda lo pendiente antes de terminar el proceso.
+        """
+        self.guardar_indices()
+
+    def _actualizar_firma_catalogo(self, libro):
+        """
+        Acumula el libro en la suma de verificacion del catalogo. Como los
+        libros solo se agregan, la firma se mantiene en O(1) por libro.
+        """
+        datos = f"{libro.id}|{libro.isbn}|{libro.titulo}|{libro.autor}\n".encode("utf-8")
+        self._firma_catalogo = zlib.crc32(datos, self._firma_catalogo)
+
+    def _firma_indices(self):
+        """
+        Identifica la version del catalogo a la que corresponden los indices.
+        """
+        return f"{len(self.libros)}-{self._firma_catalogo:08x}"
+
+    def _nuevo_libro(self, libro_id, titulo, autor, isbn, disponible=True):
+        """
+        Crea un libro compartiendo el autor, y su forma normalizada, con los
+        demas libros del mismo autor.
+        """
+        libro = Libro(libro_id, titulo, self.internador.internar(autor), isbn, disponible)
+        libro.autor_normalizado = self.internador.internar(libro.autor_normalizado)
+        return libro
+
+    def _prestamo_desde_dict(self, prestamo_data):
+        """
+        Reconstruye un prestamo a partir de su representacion persistida,
+        compartiendo usuario y fechas repetidos.
+        """
+        internar = self.internador.internar
+        return Prestamo(
+            prestamo_data['id'],
+            prestamo_data['libro_id'],
+            internar(prestamo_data['usuario']),
+            internar(prestamo_data['fecha']),
+            prestamo_data['devuelto'],
+            internar(prestamo_data.get('fecha_vencimiento')),
+            prestamo_data.get('recordatorio_enviado', False),
+            internar(prestamo_data.get('fecha_devolucion')),
+        )
+
+    @_transaccional
     def agregar_libro(self, titulo, autor, isbn):
         """
         Agrega un nuevo libro al sistema.
@@ -89,16 +418,77 @@ class SistemaBiblioteca:
         if not es_valido:
             return mensaje_validacion
 
-        libro = Libro(self.contador_libro, titulo, autor, isbn)
-        self.libros.append(libro)
-        self.contador_libro += 1
+        if normalizar_isbn(isbn) in self._libros_por_isbn:
+            return f"Error: Ya existe un libro con ISBN {isbn}"
+
+        self._registrar_libro_nuevo(titulo, autor, isbn)
 
         self._guardar_datos()
+        self._indices_pendientes = True
 
         self.notificaciones.notificar_libro_agregado(titulo, autor)
 
         return f"Libro '{titulo}' agregado exitosamente"
 
+    def _registrar_libro_nuevo(self, titulo, autor, isbn):
+        """
+        Crea el siguiente libro del catalogo y actualiza indices y firma,
+        sin persistir.
+        """
+        libro = self._nuevo_libro(self.contador_libro, titulo, autor, isbn)
+        self.libros.append(libro)
+        self._libros_por_id[libro.id] = libro
+        self._libros_por_isbn[libro.isbn_normalizado] = libro
+        self._actualizar_firma_catalogo(libro)
+        self.busqueda.indexar_libro(libro, self.libros)
+        self.contador_libro += 1
+        self.repositorio.registrar_evento(LibroAgregado(libro.id, libro.titulo, libro.autor, libro.isbn))
+        return libro
+
+    @_transaccional
+    def agregar_libros_lote(self, filas):
+        """
+        Agrega un lote de libros validandolo en una sola pasada y guardando
+        datos e indices una sola vez para todo el lote.
+
+        Args:
+            filas: Diccionarios con claves "titulo", "autor" e "isbn", o
+                   tuplas (titulo, autor, isbn)
+
+        Returns:
+            Tupla (agregados, errores) donde errores es una lista de
+            (indice_fila, mensajes) de las filas rechazadas, con todos los
+            errores de cada fila
+        """
+        filas = list(filas)
+        agregados = 0
+        errores = []
+
+        for indice, errores_fila in self.validador.validar_lote(filas):
+            if errores_fila:
+                errores.append((indice, errores_fila))
+                continue
+
+            fila = filas[indice]
+            if isinstance(fila, dict):
+                titulo, autor, isbn = fila["titulo"], fila["autor"], fila["isbn"]
+            else:
+                titulo, autor, isbn = fila
+
+            if normalizar_isbn(isbn) in self._libros_por_isbn:
+                errores.append((indice, [f"Error: Ya existe un libro con ISBN {isbn}"]))
+                continue
+
+            self._registrar_libro_nuevo(titulo, autor, isbn)
+            agregados += 1
+
+        if agregados:
+            self._guardar_datos()
+            self._indices_pendientes = True
+
+        return agregados, errores
+
+    @_sincronizado
     def buscar_libro(self, criterio, valor):
         """
         Busca libros usando el metodo de busqueda.
@@ -109,6 +499,30 @@ class SistemaBiblioteca:
             print(f"Error de búsqueda: {e}")
             return []
 
+    @_sincronizado
+    def autocompletar(self, criterio, prefijo, limite=10):
+        """
+        Sugiere titulos o autores que completan el prefijo escrito.
+        """
+        try:
+            return self.busqueda.autocompletar(criterio, self.libros, prefijo, limite)
+        except ValueError as e:
+            print(f"Error de búsqueda: {e}")
+            return []
+
+    @_sincronizado
+    def buscar_libros_lote(self, consultas):
+        """
+        Resuelve muchas busquedas (criterio, valor) recorriendo el catalogo
+        una sola vez por criterio. Retorna un diccionario indexado por consulta.
+        """
+        try:
+            return self.busqueda.buscar_lote(consultas, self.libros)
+        except ValueError as e:
+            print(f"Error de búsqueda: {e}")
+            return {}
+
+    @_transaccional
     def realizar_prestamo(self, libro_id, usuario):
         """
         Realiza un prestamo de libro a un usuario.
@@ -125,45 +539,74 @@ class SistemaBiblioteca:
         if not libro:
             return "Error: Libro no encontrado"
 
-        if not libro.disponible:
+        apartado_para = self._apartados.get(libro_id)
+        if apartado_para is not None and apartado_para != usuario:
+            return "Error: Libro apartado para otro usuario"
+        if apartado_para is None and not libro.disponible:
             return "Error: Libro no disponible"
 
-        from datetime import datetime
+        limite = self.usuarios.obtener(usuario).calcular_limite_prestamos()
+        if self.contar_prestamos_activos(usuario) >= limite:
+            return f"Error: {usuario} alcanzo su limite de {limite} prestamos activos"
+
+        hoy = date.today()
+        internar = self.internador.internar
         prestamo = Prestamo(
-            self.contador_prestamo,
-            libro_id,
-            usuario,
-            False,
-            datetime.now().strftime("%Y-%m-%d")
+            id=self.contador_prestamo,
+            libro_id=libro_id,
+            usuario=internar(usuario),
+            fecha=internar(hoy.strftime("%Y-%m-%d")),
+            fecha_vencimiento=internar((hoy + timedelta(days=self.dias_prestamo)).strftime("%Y-%m-%d"))
         )
 
-        self.prestamos.append(prestamo)
+        self._prestamos_por_id[prestamo.id] = prestamo
+        self.indice_fechas.agregar(prestamo.dia, prestamo.id)
+        self._sumar_prestamo_activo(prestamo.usuario, 1)
+        self.planificador.programar(prestamo.fecha_vencimiento, prestamo.id)
         self.contador_prestamo += 1
         libro.disponible = False
+        self._apartados.pop(libro_id, None)
+        if self._analitica_vigente:
+            self.analitica.registrar_prestamo(prestamo, libro.autor)
 
+        self.repositorio.registrar_evento(PrestamoRealizado(
+            prestamo.id, libro_id, prestamo.usuario, prestamo.fecha, prestamo.fecha_vencimiento
+        ))
         self._guardar_datos()
 
         self.notificaciones.notificar_prestamo_realizado(usuario, libro.titulo, prestamo.fecha)
 
         return f"Prestamo realizado a {usuario}"
 
+    @_sincronizado
+    def contar_prestamos_activos(self, usuario):
+        """
+        Prestamos activos del usuario, en O(1) sin recorrer los prestamos.
+        """
+        return self._activos_por_usuario.get(usuario, 0)
+
+    def _sumar_prestamo_activo(self, usuario, delta):
+        """
+        Actualiza el contador de prestamos activos del usuario, sin guardar
+        usuarios con cero prestamos.
+        """
+        total = self._activos_por_usuario.get(usuario, 0) + delta
+        if total > 0:
+            self._activos_por_usuario[usuario] = total
+        else:
+            self._activos_por_usuario.pop(usuario, None)
+
     def _buscar_libro_por_id(self, libro_id: int):
         """
         Metodo auxiliar para buscar un libro por su ID.
         """
-        for libro in self.libros:
-            if libro.id == libro_id:
-                return libro
-        return None
+        return self._libros_por_id.get(libro_id)
 
     def _buscar_prestamo_por_id(self, prestamo_id: int):
         """
         Metodo auxiliar para buscar un prestamo por su ID.
         """
-        for prestamo in self.prestamos:
-            if prestamo.id == prestamo_id:
-                return prestamo
-        return None
+        return self._prestamos_por_id.get(prestamo_id)
 
     def _guardar_datos(self):
         """
@@ -173,11 +616,13 @@ class SistemaBiblioteca:
             self.libros,
             self.prestamos,
             self.contador_libro,
-            self.contador_prestamo
+            self.contador_prestamo,
+            self._reservas_a_dicts()
         )
         if not exito:
             self.notificaciones.notificar_error("Persistencia", "Error al guardar datos")
 
+    @_transaccional
     def devolver_libro(self, prestamo_id):
         """
         Procesa la devolucion de un libro.
@@ -188,44 +633,329 @@ class SistemaBiblioteca:
 
         prestamo = self._buscar_prestamo_por_id(prestamo_id)
         if not prestamo:
+            # Con archivo, en memoria solo faltan los prestamos ya devueltos;
+            # basta el contador para no recorrer el historial en disco.
+            if self.archivo_prestamos and prestamo_id < self.contador_prestamo:
+                return "Error: Libro ya devuelto"
             return "Error: Prestamo no encontrado"
 
         if prestamo.devuelto:
             return "Error: Libro ya devuelto"
 
         libro = self._buscar_libro_por_id(prestamo.libro_id)
-        if libro:
+        siguiente = self._entregar_a_siguiente_reserva(prestamo.libro_id)
+        if libro and siguiente is None:
             libro.disponible = True
 
         prestamo.devuelto = True
-
+        self._sumar_prestamo_activo(prestamo.usuario, -1)
+        prestamo.fecha_devolucion = self.internador.internar(date.today().strftime("%Y-%m-%d"))
+        if self._analitica_vigente:
+            self.analitica.registrar_devolucion(prestamo)
+
+        archivado = bool(self.archivo_prestamos and self.archivo_prestamos.archivar(prestamo))
+        if archivado:
+            del self._prestamos_por_id[prestamo.id]
+            self.indice_fechas.quitar(prestamo.dia, prestamo.id)
+
+        self.repositorio.registrar_evento(LibroDevuelto(
+            prestamo.id, prestamo.libro_id, prestamo.fecha_devolucion, siguiente, archivado
+        ))
         self._guardar_datos()
 
         if libro:
             self.notificaciones.notificar_libro_devuelto(prestamo.usuario, libro.titulo)
-            self.notificaciones.notificar_libro_disponible(libro.titulo)
+            if siguiente is None:
+                self.notificaciones.notificar_libro_disponible(libro.titulo)
+            else:
+                self.notificaciones.notificar_reserva_disponible(siguiente, libro.titulo)
 
         return "Libro devuelto exitosamente"
 
+    @_transaccional
+    def reservar_libro(self, libro_id, usuario):
+        """
+        Pone al usuario en la cola de espera de un libro prestado. Al
+        devolverse, el libro queda apartado para el primero de la cola.
+        """
+        es_valido_usuario, mensaje_usuario = self.validador.validar_usuario(usuario)
+        if not es_valido_usuario:
+            return mensaje_usuario
+
+        es_valido_id, mensaje_id = self.validador.validar_id(libro_id, "libro")
+        if not es_valido_id:
+            return mensaje_id
+
+        libro = self._buscar_libro_por_id(libro_id)
+        if not libro:
+            return "Error: Libro no encontrado"
+
+        if libro.disponible:
+            return "Error: Libro disponible, puede pedirse en prestamo"
+
+        cola = self._reservas.setdefault(libro_id, deque())
+        if usuario in cola or self._apartados.get(libro_id) == usuario:
+            return "Error: El usuario ya tiene una reserva para este libro"
+
+        cola.append(self.internador.internar(usuario))
+        self.repositorio.registrar_evento(ReservaRegistrada(libro_id, usuario))
+        self._guardar_datos()
+
+        return f"Reserva registrada para {usuario}, posicion {len(cola)}"
+
+    @_transaccional
+    def cancelar_reserva(self, libro_id, usuario):
+        """
+        Saca al usuario de la cola del libro. Si el libro ya estaba apartado
+        para el, pasa al siguiente de la cola o vuelve a estar disponible.
+        """
+        libro = self._buscar_libro_por_id(libro_id)
+        if not libro:
+            return "Error: Libro no encontrado"
+
+        if self._apartados.get(libro_id) == usuario:
+            del self._apartados[libro_id]
+            siguiente = self._entregar_a_siguiente_reserva(libro_id)
+            if siguiente is None:
+                libro.disponible = True
+            self.repositorio.registrar_evento(ReservaCancelada(libro_id, usuario, siguiente))
+            self._guardar_datos()
+            if siguiente is None:
+                self.notificaciones.notificar_libro_disponible(libro.titulo)
+            else:
+                self.notificaciones.notificar_reserva_disponible(siguiente, libro.titulo)
+            return "Reserva cancelada"
+
+        cola = self._reservas.get(libro_id)
+        if not cola or usuario not in cola:
+            return "Error: Reserva no encontrada"
+
+        cola.remove(usuario)
+        if not cola:
+            del self._reservas[libro_id]
+        self.repositorio.registrar_evento(ReservaCancelada(libro_id, usuario))
+        self._guardar_datos()
+        return "Reserva cancelada"
+
+    @_sincronizado
+    def obtener_reservas(self, libro_id):
+        """
+        Usuario para el que esta apartado el libro (o None) y cola de espera.
+        """
+        return self._apartados.get(libro_id), list(self._reservas.get(libro_id, ()))
+
+    def _entregar_a_siguiente_reserva(self, libro_id):
+        """
+        Aparta el libro para el primero de su cola en O(1). Retorna ese
+        usuario, o None si nadie esperaba el libro.
+        """
+        cola = self._reservas.get(libro_id)
+        if not cola:
+            return None
+
+        siguiente = cola.popleft()
+        if not cola:
+            del self._reservas[libro_id]
+        self._apartados[libro_id] = siguiente
+        return siguiente
+
+    def _reservas_a_dicts(self):
+        """
+        Colas y apartados por libro en el formato que guarda el repositorio.
+        """
+        return [
+            {
+                "libro_id": libro_id,
+                "cola": list(self._reservas.get(libro_id, ())),
+                "apartado_para": self._apartados.get(libro_id)
+            }
+            for libro_id in sorted(self._reservas.keys() | self._apartados.keys())
+        ]
+
+    @_transaccional
+    def procesar_recordatorios(self, hoy=None):
+        """
+        Envia los recordatorios de devolucion de los prestamos que vencen
+        hasta la fecha indicada (por defecto hoy). Solo examina los
+        prestamos vencidos, no todos los activos. Retorna cuantos envio.
+
+        El sistema no tiene temporizador propio: quien lo usa debe llamar a
+        este metodo periodicamente. ServidorBiblioteca lo hace en su tarea
+        de mantenimiento.
+        """
+        hasta = (hoy or date.today()).strftime("%Y-%m-%d")
+
+        enviados = 0
+        for prestamo_id in self.planificador.extraer_vencidos(hasta):
+            prestamo = self._buscar_prestamo_por_id(prestamo_id)
+            if not prestamo or not self._requiere_recordatorio(prestamo):
+                continue
+
+            libro = self._buscar_libro_por_id(prestamo.libro_id)
+            self.notificaciones.notificar_recordatorio_devolucion(
+                prestamo.usuario,
+                libro.titulo if libro else f"ID {prestamo.libro_id}",
+                prestamo.fecha_vencimiento
+            )
+            prestamo.recordatorio_enviado = True
+            self.repositorio.registrar_evento(RecordatorioEnviado(prestamo.id))
+            enviados += 1
+
+        if enviados:
+            self._guardar_datos()
+
+        return enviados
+
+    @staticmethod
+    def _requiere_recordatorio(prestamo):
+        """
+        Indica si un prestamo todavia debe recibir su recordatorio.
+        """
+        return (not prestamo.devuelto
+                and not prestamo.recordatorio_enviado
+                and bool(prestamo.fecha_vencimiento))
+
+    @_sincronizado
     def obtener_todos_libros(self):
-        """Retorna todos los libros del sistema."""
-        return self.libros
+        """Retorna una vista de solo lectura de todos los libros del sistema."""
+        return VistaSoloLectura(self.libros)
 
+    @_sincronizado
     def obtener_libros_disponibles(self):
-        """Retorna solo los libros disponibles."""
-        return [libro for libro in self.libros if libro.disponible]
+        """Retorna una vista de solo lectura de los libros disponibles."""
+        return VistaFiltrada(self.libros, lambda libro: libro.disponible)
 
+    @_sincronizado
     def obtener_prestamos_activos(self):
-        """Retorna solo los prestamos activos (no devueltos)."""
-        return [p for p in self.prestamos if not p.devuelto]
+        """
+        Retorna una vista de solo lectura de los prestamos activos (no
+        devueltos). Cada iteracion recorre una copia de los prestamos, asi
+        que se puede devolver cada prestamo mientras se itera la vista.
+        """
+        return VistaFiltrada(self.prestamos, lambda prestamo: not prestamo.devuelto,
+                             instantanea=True)
+
+    def obtener_estadisticas_internado(self):
+        """Retorna cuanta memoria ahorra compartir cadenas repetidas."""
+        return self.internador.obtener_estadisticas()
+
+    @_sincronizado
+    def obtener_prestamos_en_rango(self, desde, hasta, solo_activos=False):
+        """
+        Prestamos en memoria realizados entre dos fechas (date o "%Y-%m-%d"),
+        ambas incluidas, ordenados por fecha. Con archivo_prestamos, los
+        devueltos ya archivados no se incluyen.
+        """
+        dia_desde, dia_hasta = a_ordinal(desde), a_ordinal(hasta)
+        if dia_desde is None or dia_hasta is None:
+            print("Error de búsqueda: las fechas deben tener formato AAAA-MM-DD")
+            return []
+        return self._prestamos_por_ids(self.indice_fechas.en_rango(dia_desde, dia_hasta), solo_activos)
+
+    @_sincronizado
+    def obtener_prestamos_con_antiguedad(self, dias, hoy=None, solo_activos=True):
+        """
+        Prestamos realizados hace mas de dias dias respecto de hoy, del mas
+        antiguo al mas reciente; por defecto solo los que siguen activos.
+        """
+        limite = (hoy or date.today()).toordinal() - dias
+        return self._prestamos_por_ids(self.indice_fechas.anteriores_a(limite), solo_activos)
+
+    def _prestamos_por_ids(self, prestamo_ids, solo_activos):
+        """
+        Resuelve IDs del indice de fechas a prestamos, filtrando los devueltos
+        si se pide.
+        """
+        prestamos = (self._prestamos_por_id[prestamo_id] for prestamo_id in prestamo_ids)
+        return [prestamo for prestamo in prestamos if not (solo_activos and prestamo.devuelto)]
+
+    @_sincronizado
+    def obtener_estadisticas_circulacion(self, top_autores=10, dia=None):
+        """
+        Resume la circulacion: prestamos del dia (por defecto hoy), autores
+        mas prestados, tasa de utilizacion y duracion promedio. Los agregados
+        se construyen con el historial completo en la primera consulta y
+        despues se actualizan en cada prestamo y devolucion.
+        """
+        if not self._analitica_vigente:
+            self.reconstruir_analitica()
+
+        dia = dia or date.today().strftime("%Y-%m-%d")
+        return {
+            "prestamos_del_dia": self.analitica.prestamos_en_dia(dia),
+            "autores_mas_prestados": self.analitica.autores_mas_prestados(top_autores),
+            "prestamos_activos": self.analitica.prestamos_activos,
+            "tasa_utilizacion": self.analitica.tasa_utilizacion(len(self.libros)),
+            "duracion_promedio_dias": self.analitica.duracion_promedio(),
+            "total_prestamos": self.analitica.total_prestamos
+        }
+
+    def reconstruir_analitica(self):
+        """
+        Recalcula los agregados de circulacion recorriendo todo el historial,
+        incluido el archivado.
+        """
+        autor_de_libro = {libro.id: libro.autor for libro in self.libros}
+        self.analitica.reconstruir(self.obtener_historial_prestamos(), autor_de_libro)
+        self._analitica_vigente = True
+
+    @_sincronizado
+    def obtener_historial_prestamos(self, usuario=None, libro_id=None):
+        """
+        Recorre todos los prestamos, archivados y en memoria, filtrando
+        opcionalmente por usuario y por libro. Lee el historial bajo demanda.
+        """
+        archivados = (
+            self._prestamo_desde_dict(registro)
+            for registro in (self.archivo_prestamos.iterar() if self.archivo_prestamos else ())
+        )
+        for prestamo in itertools.chain(archivados, list(self.prestamos)):
+            if usuario is not None and prestamo.usuario != usuario:
+                continue
+            if libro_id is not None and prestamo.libro_id != libro_id:
+                continue
+            yield prestamo
+
+    @_sincronizado
+    def iterar_libros(self, disponible=None):
+        """
+        Recorre el catalogo libro por libro, opcionalmente solo los libros
+        con la disponibilidad indicada.
+        """
+        for libro in VistaSoloLectura(self.libros):
+            if disponible is None or libro.disponible == disponible:
+                yield libro
+
+    def iterar_prestamos(self, devuelto=None):
+        """
+        Recorre todos los prestamos, archivados y en memoria, opcionalmente
+        solo los devueltos (True) o los activos (False).
+        """
+        for prestamo in self.obtener_historial_prestamos():
+            if devuelto is None or prestamo.devuelto == devuelto:
+                yield prestamo
+
+    def exportar_libros(self, ruta, formato=None, disponible=None):
+        """
+        Exporta el catalogo a CSV o JSON Lines escribiendo cada libro a
+        medida que se recorre. Retorna la cantidad exportada.
+        """
+        return exportar(self.iterar_libros(disponible), ruta, CAMPOS_LIBRO, formato)
+
+    def exportar_prestamos(self, ruta, formato=None, devuelto=None):
+        """
+        Exporta los prestamos, incluido el historial archivado, a CSV o
+        JSON Lines. Retorna la cantidad exportada.
+        """
+        return exportar(self.iterar_prestamos(devuelto), ruta, CAMPOS_PRESTAMO, formato)
 
 def main(sistema: SistemaBiblioteca):
     """
     Funcion principal que demuestra el uso del sistema refactorizado.
     """
     print("\n=== AGREGANDO LIBROS ===")
-    print(sistema.agregar_libro("Cien Años de Soledad", "Gabriel Garcia Marquez", "9780060883287"))
-    print(sistema.agregar_libro("El Principito", "Antoine de Saint-Exupery", "9780156012195"))
+    print(sistema.agregar_libro("Cien Años de Soledad", "Gabriel García Márquez", "9780060883287"))
+    print(sistema.agregar_libro("El Principito", "Antoine de Saint-Exupéry", "9780156012195"))
     print(sistema.agregar_libro("1984", "George Orwell", "9780451524935"))
 
     print("\n=== BUSQUEDA POR AUTOR ===")
@@ -251,7 +981,6 @@ def main(sistema: SistemaBiblioteca):
         print(f"- Prestamo ID {prestamo.id} para libro ID {prestamo.libro_id} a {prestamo.usuario}")
 
 if __name__ == "__main__":
-    busqueda = Busqueda()
     validador = ValidadorBiblioteca()
     notificaciones = ServicioNotificaciones()
 
@@ -260,21 +989,23 @@ if __name__ == "__main__":
 
     print("\n" + "="*60)
     biblioteca_sistema = SistemaBiblioteca(
-        busqueda=busqueda,
+        busqueda=Busqueda(),
         validador=validador,
         repositorio=repositorio,
         notificaciones=notificaciones
     )
     main(biblioteca_sistema)
+    biblioteca_sistema.cerrar()
 
     # Ejemplo con repositorio archivo
     repositorio=RepositorioArchivo("biblioteca_refactorizada.json")
 
     print("\n" + "="*60)
     biblioteca_sistema = SistemaBiblioteca(
-        busqueda=busqueda,
+        busqueda=Busqueda(),
         validador=validador,
         repositorio=repositorio,
         notificaciones=notificaciones
     )
     main(biblioteca_sistema)
+    biblioteca_sistema.cerrar()
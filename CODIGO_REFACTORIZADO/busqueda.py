@@ -2,12 +2,20 @@
 ESTRATEGIAS DE BUSQUEDA
 """
 
+import gc
+import itertools
+import json
+import os
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, Iterable, List, Tuple
+from normalizacion import normalizar_isbn, normalizar_texto
+from indices_busqueda import IndicePrefijos, IndiceTrigramas, extraer_palabras
 
 
 class Libro: ...
 
+_VERSION_FORMATO_INDICES = 3
+
 class Buscador(ABC):
     """
     Clase abstracta que define la interfaz para todas las estrategias de busqueda.
@@ -26,47 +34,189 @@ class Buscador(ABC):
         """
         pass
 
+    def buscar_lote(self, libros: List[Libro], valores: Iterable[str]) -> Dict[str, List[Libro]]:
+        """
+        Resuelve varios valores de busqueda a la vez.
+
+        La implementacion por defecto ejecuta una busqueda por valor; las
+        estrategias que puedan resolver el lote en una sola pasada sobre
+        los libros deben sobrescribir este metodo.
+
+        Args:
+            libros: Lista de libros donde buscar
+            valores: Valores a buscar segun el criterio de la estrategia
+
+        Returns:
+            Diccionario valor -> lista de libros que coinciden
+        """
+        return {valor: self.buscar(libros, valor) for valor in valores}
+
+    def indexar(self, libro: Libro, libros: List[Libro]) -> None:
+        """
+        Notifica a la estrategia que se agrego un libro al catalogo libros.
+        Las estrategias sin indice no necesitan hacer nada.
+        """
+
+    def reconstruir_indice(self, libros: List[Libro]) -> None:
+        """
+        Indica a la estrategia que el catalogo completo cambio (por ejemplo,
+        al cargar datos). Las estrategias sin indice no necesitan hacer nada.
+        """
+
+class BuscadorIndexado(Buscador):
+    """
+    Clase base para estrategias que mantienen un indice propio.
+
+    El indice se construye de forma perezosa en la primera busqueda y luego
+    se mantiene incrementalmente con cada libro agregado. Queda ligado a la
+    lista de libros de la que se construyo: si se busca sobre otra lista
+    (por ejemplo, otro sistema que comparte la misma Busqueda) se
+    reconstruye desde esa lista. Las subclases con _persistible = True
+    implementan _exportar_estado e _importar_estado para persistir el
+    indice como JSON, con los libros referidos por ID.
+    """
+    _persistible = False
+
+    def __init__(self):
+        """
+        Inicializa la estrategia sin indice construido.
+        """
+        self._indexado = False
+        self._fuente = None
+
+    def indexar(self, libro: Libro, libros: List[Libro]) -> None:
+        """
+        Agrega el libro al indice si este ya fue construido sobre libros.
+        Si aun esta pendiente, el libro se incluira al construirlo.
+        """
+        if self._indexado and libros is self._fuente:
+            self._agregar_al_indice(libro)
+
+    def reconstruir_indice(self, libros: List[Libro]) -> None:
+        """
+        Descarta el indice actual; se reconstruira desde libros en la
+        siguiente busqueda.
+        """
+        self._indexado = False
+        self._fuente = libros
+
+    def _asegurar_indice(self, libros: List[Libro]) -> None:
+        """
+        Construye el indice si todavia no existe o si fue construido sobre
+        otra lista de libros.
+        """
+        if self._indexado and libros is self._fuente:
+            return
+
+        self._limpiar_indice()
+        for libro in libros:
+            self._agregar_al_indice(libro)
+        self._indexado = True
+        self._fuente = libros
+
+    def exportar_indice(self, libros: List[Libro]) -> Dict[str, Any]:
+        """
+        Construye el indice si hace falta y retorna sus estructuras para
+        persistirlas.
+        """
+        self._asegurar_indice(libros)
+        return self._exportar_estado()
+
+    def importar_indice(self, estado: Dict[str, Any], libros: List[Libro],
+                        libros_por_id: Dict[int, Libro]) -> None:
+        """
+        Restaura estructuras exportadas previamente sobre el catalogo libros.
+        Lanza KeyError o ValueError si el estado no corresponde al catalogo.
+        """
+        self._importar_estado(estado, libros_por_id)
+        self._indexado = True
+        self._fuente = libros
+
+    def _exportar_estado(self) -> Dict[str, Any]:
+        """Estructuras del indice como JSON, con libros por ID."""
+        raise TypeError(f"{type(self).__name__} no persiste su indice")
+
+    def _importar_estado(self, estado: Dict[str, Any], libros_por_id: Dict[int, Libro]) -> None:
+        """Restaura las estructuras retornadas por _exportar_estado."""
+        raise TypeError(f"{type(self).__name__} no persiste su indice")
+
+    @abstractmethod
+    def _limpiar_indice(self) -> None:
+        """Vacia las estructuras del indice."""
+        pass
+
+    @abstractmethod
+    def _agregar_al_indice(self, libro: Libro) -> None:
+        """Agrega un libro a las estructuras del indice."""
+        pass
+
 class BusquedaPorTitulo(Buscador):
     """
     Estrategia de busqueda por titulo del libro.
-    Realiza busqueda parcial case-insensitive.
+    Realiza busqueda parcial insensible a mayusculas y acentos.
     """
     def buscar(self, libros: List[Libro], valor: str) -> List[Libro]:
         """
         Busca libros que contengan el valor en el nombre del titulo.
         """
+        consulta = normalizar_texto(valor)
         return [
-            libro for libro in libros 
-            if valor.lower() in libro.titulo.lower()
+            libro for libro in libros
+            if consulta in libro.titulo_normalizado
         ]
 
+    def buscar_lote(self, libros: List[Libro], valores: Iterable[str]) -> Dict[str, List[Libro]]:
+        """
+        Resuelve todos los valores en una sola pasada sobre los libros.
+        """
+        return _lote_por_subcadena(libros, valores, lambda libro: libro.titulo_normalizado)
+
 class BusquedaPorAutor(Buscador):
     """
     Estrategia de busqueda por autor del libro.
-    Realiza busqueda parcial case-insensitive.
+    Realiza busqueda parcial insensible a mayusculas y acentos.
     """
     def buscar(self, libros: List[Libro], valor: str) -> List[Libro]:
         """
         Busca libros que contengan el valor en el nombre del autor.
         """
+        consulta = normalizar_texto(valor)
         return [
-            libro for libro in libros 
-            if valor.lower() in libro.autor.lower()
+            libro for libro in libros
+            if consulta in libro.autor_normalizado
         ]
 
-class BusquedaPorISBN(Buscador):
+    def buscar_lote(self, libros: List[Libro], valores: Iterable[str]) -> Dict[str, List[Libro]]:
+        """
+        Resuelve todos los valores en una sola pasada sobre los libros.
+        """
+        return _lote_por_subcadena(libros, valores, lambda libro: libro.autor_normalizado)
+
+class BusquedaPorISBN(BuscadorIndexado):
     """
     Estrategia de busqueda por ISBN del libro.
-    Realiza busqueda exacta.
+    Realiza busqueda exacta sobre el ISBN normalizado usando un indice hash,
+    por lo que el costo de cada consulta no depende del tamano del catalogo.
+    El indice no se persiste: construirlo cuesta lo mismo que leerlo.
     """
     def buscar(self, libros: List[Libro], valor: str) -> List[Libro]:
         """
-        Busca libros con el ISBN exacto.
+        Busca libros con el ISBN exacto, ignorando guiones y espacios.
         """
-        return [
-            libro for libro in libros
-            if libro.isbn == valor
-        ]
+        self._asegurar_indice(libros)
+        return list(self._libros_por_isbn.get(normalizar_isbn(valor), ()))
+
+    def buscar_lote(self, libros: List[Libro], valores: Iterable[str]) -> Dict[str, List[Libro]]:
+        """
+        Resuelve cada ISBN con una consulta al indice.
+        """
+        return {valor: self.buscar(libros, valor) for valor in valores}
+
+    def _limpiar_indice(self) -> None:
+        self._libros_por_isbn: Dict[str, List[Libro]] = {}
+
+    def _agregar_al_indice(self, libro: Libro) -> None:
+        self._libros_por_isbn.setdefault(libro.isbn_normalizado, []).append(libro)
 
 class BusquedaPorDisponibilidad(Buscador):
     """
@@ -82,6 +232,198 @@ class BusquedaPorDisponibilidad(Buscador):
             if libro.disponible == disponible
         ]
 
+    def buscar_lote(self, libros: List[Libro], valores: Iterable[str]) -> Dict[str, List[Libro]]:
+        """
+        Separa los libros en disponibles y no disponibles en una sola pasada.
+        """
+        valores = list(valores)
+        disponibles, no_disponibles = [], []
+        for libro in libros:
+            (disponibles if libro.disponible else no_disponibles).append(libro)
+        return {
+            valor: disponibles if valor.lower() == "true" else no_disponibles
+            for valor in valores
+        }
+
+class BusquedaDifusa(BuscadorIndexado):
+    """
+    Estrategia de busqueda tolerante a errores de escritura.
+
+    Indexa las palabras normalizadas del campo por trigramas, de modo que
+    cada consulta verifica solo unos pocos candidatos del vocabulario y no
+    compara contra todos los libros. Un libro coincide si cada palabra de
+    la consulta esta a distancia de edicion tolerable de alguna de sus
+    palabras; los resultados se ordenan por la suma de esas distancias.
+    """
+    _persistible = True
+
+    def __init__(self, campo: str = "autor", distancia_maxima: int = 2):
+        """
+        Args:
+            campo: Campo del libro a indexar ("titulo" o "autor")
+            distancia_maxima: Distancia de edicion maxima por palabra
+        """
+        super().__init__()
+        self.campo = campo
+        self.distancia_maxima = distancia_maxima
+        self._limpiar_indice()
+
+    def buscar(self, libros: List[Libro], valor: str) -> List[Libro]:
+        """
+        Busca libros cuyo campo se parezca al valor, del mas al menos similar.
+        """
+        self._asegurar_indice(libros)
+
+        palabras = extraer_palabras(normalizar_texto(valor))
+        if not palabras:
+            return []
+
+        puntajes: Dict[int, int] = {}
+        for posicion, palabra in enumerate(palabras):
+            mejores: Dict[int, int] = {}
+            for distancia, _, libros_palabra in self._indice.buscar(palabra, self._tolerancia(palabra)):
+                for libro in libros_palabra:
+                    if libro.id not in mejores:
+                        mejores[libro.id] = distancia
+            if posicion == 0:
+                puntajes = mejores
+            else:
+                puntajes = {
+                    clave: puntaje + mejores[clave]
+                    for clave, puntaje in puntajes.items()
+                    if clave in mejores
+                }
+            if not puntajes:
+                return []
+
+        return sorted(
+            (self._libros[clave] for clave in puntajes),
+            key=lambda libro: (puntajes[libro.id], libro.id)
+        )
+
+    def _tolerancia(self, palabra: str) -> int:
+        """
+        Distancia permitida para una palabra: palabras cortas exigen mayor
+        exactitud para no coincidir con casi todo el vocabulario.
+        """
+        return min(self.distancia_maxima, len(palabra) // 3)
+
+    def _limpiar_indice(self) -> None:
+        self._indice: IndiceTrigramas[List[Libro]] = IndiceTrigramas()
+        self._libros_por_palabra: Dict[str, List[Libro]] = {}
+        self._libros: Dict[int, Libro] = {}
+
+    def _agregar_al_indice(self, libro: Libro) -> None:
+        self._libros[libro.id] = libro
+        texto = getattr(libro, f"{self.campo}_normalizado")
+        for palabra in set(extraer_palabras(texto)):
+            libros_palabra = self._libros_por_palabra.get(palabra)
+            if libros_palabra is None:
+                libros_palabra = self._libros_por_palabra[palabra] = []
+                self._indice.agregar(palabra, libros_palabra)
+            libros_palabra.append(libro)
+
+    def _exportar_estado(self) -> Dict[str, Any]:
+        return {"indice": self._indice.exportar(),
+                "libros_por_palabra": _ids_por_clave(self._libros_por_palabra)}
+
+    def _importar_estado(self, estado: Dict[str, Any], libros_por_id: Dict[int, Libro]) -> None:
+        libros_por_palabra = _libros_por_clave(estado["libros_por_palabra"], libros_por_id)
+        self._indice = IndiceTrigramas.importar(
+            estado["indice"], [libros_por_palabra[palabra] for palabra in estado["indice"]["terminos"]])
+        self._libros_por_palabra = libros_por_palabra
+        self._libros = {libro.id: libro for libros in libros_por_palabra.values() for libro in libros}
+
+class AutocompletadoPorPrefijo(BuscadorIndexado):
+    """
+    Estrategia de autocompletado por prefijo sobre un indice ordenado.
+
+    Pensada para consultas en cada pulsacion de tecla: en lugar de recorrer
+    todo el catalogo, ubica el prefijo con bisect y lee solo los k
+    resultados contiguos. El indice guarda cada valor normalizado distinto
+    una sola vez, con la lista de sus libros, para que k sugerencias
+    distintas sean k entradas aunque muchos libros compartan el valor.
+    """
+    _persistible = True
+
+    def __init__(self, campo: str = "titulo"):
+        """
+        Args:
+            campo: Campo del libro a indexar ("titulo" o "autor")
+        """
+        super().__init__()
+        self.campo = campo
+        self._limpiar_indice()
+
+    def buscar(self, libros: List[Libro], valor: str) -> List[Libro]:
+        """
+        Busca libros con alguna palabra del campo que empiece por el valor.
+        """
+        self._asegurar_indice(libros)
+        return [
+            libro
+            for libros_valor in self._indice.iterar(normalizar_texto(valor))
+            for libro in libros_valor
+        ]
+
+    def completar(self, libros: List[Libro], prefijo: str, limite: int = 10) -> List[str]:
+        """
+        Retorna hasta limite valores distintos del campo que completan el prefijo.
+        """
+        self._asegurar_indice(libros)
+        consulta = normalizar_texto(prefijo)
+        return [
+            getattr(libros_valor[0], self.campo)
+            for libros_valor in itertools.islice(self._indice.iterar(consulta), limite)
+        ]
+
+    def _limpiar_indice(self) -> None:
+        self._indice: IndicePrefijos[List[Libro]] = IndicePrefijos()
+        self._libros_por_valor: Dict[str, List[Libro]] = {}
+
+    def _agregar_al_indice(self, libro: Libro) -> None:
+        valor = getattr(libro, f"{self.campo}_normalizado")
+        libros_valor = self._libros_por_valor.get(valor)
+        if libros_valor is None:
+            libros_valor = self._libros_por_valor[valor] = []
+            self._indice.agregar(valor, libros_valor)
+        libros_valor.append(libro)
+
+    def _exportar_estado(self) -> Dict[str, Any]:
+        return {"indice": self._indice.exportar(),
+                "libros_por_valor": _ids_por_clave(self._libros_por_valor)}
+
+    def _importar_estado(self, estado: Dict[str, Any], libros_por_id: Dict[int, Libro]) -> None:
+        libros_por_valor = _libros_por_clave(estado["libros_por_valor"], libros_por_id)
+        # Cada valor se agrego al indice al crear su entrada, asi que el
+        # orden del diccionario es el orden de posiciones del indice.
+        self._indice = IndicePrefijos.importar(
+            estado["indice"], list(libros_por_valor), list(libros_por_valor.values()))
+        self._libros_por_valor = libros_por_valor
+
+def _ids_por_clave(libros_por_clave: Dict[str, List[Libro]]) -> Dict[str, List[int]]:
+    """Reemplaza cada libro por su ID para persistir un indice."""
+    return {clave: [libro.id for libro in libros] for clave, libros in libros_por_clave.items()}
+
+def _libros_por_clave(ids_por_clave: Dict[str, List[int]],
+                      libros_por_id: Dict[int, Libro]) -> Dict[str, List[Libro]]:
+    """Inverso de _ids_por_clave; lanza KeyError si falta algun libro."""
+    return {clave: [libros_por_id[libro_id] for libro_id in ids] for clave, ids in ids_por_clave.items()}
+
+def _lote_por_subcadena(libros: List[Libro], valores: Iterable[str], campo) -> Dict[str, List[Libro]]:
+    """
+    Busqueda parcial de varios valores en una sola pasada sobre las claves
+    normalizadas de los libros. Cada valor se normaliza una sola vez.
+    """
+    resultados = {valor: [] for valor in valores}
+    consultas = [(normalizar_texto(valor), resultados[valor]) for valor in resultados]
+    for libro in libros:
+        texto = campo(libro)
+        for consulta, coincidencias in consultas:
+            if consulta in texto:
+                coincidencias.append(libro)
+    return resultados
+
 class Busqueda:
     """
     Esta clase permite cambiar el algoritmo de busqueda dinamicamente
@@ -91,11 +433,19 @@ class Busqueda:
         """
         Inicializa el contexto con un diccionario de estrategias disponibles.
         """
+        self._autocompletado = {
+            "titulo": AutocompletadoPorPrefijo("titulo"),
+            "autor": AutocompletadoPorPrefijo("autor")
+        }
         self._estrategias = {
             "titulo": BusquedaPorTitulo(),
             "autor": BusquedaPorAutor(),
             "isbn": BusquedaPorISBN(),
-            "disponible": BusquedaPorDisponibilidad()
+            "disponible": BusquedaPorDisponibilidad(),
+            "titulo_difuso": BusquedaDifusa("titulo"),
+            "autor_difuso": BusquedaDifusa("autor"),
+            "titulo_prefijo": self._autocompletado["titulo"],
+            "autor_prefijo": self._autocompletado["autor"]
         }
 
     def agregar_estrategia(self, nombre: str, estrategia: Buscador):
@@ -113,7 +463,9 @@ class Busqueda:
         Ejecuta la busqueda usando la estrategia correspondiente al criterio.
 
         Args:
-            criterio: Tipo de busqueda ("titulo", "autor", "isbn", "disponible")
+            criterio: Tipo de busqueda ("titulo", "autor", "isbn", "disponible",
+                      "titulo_difuso", "autor_difuso", "titulo_prefijo",
+                      "autor_prefijo")
             libros: Lista de libros donde buscar
             valor: Valor a buscar
 
@@ -127,6 +479,157 @@ class Busqueda:
         estrategia = self._estrategias[criterio]
         return estrategia.buscar(libros, valor)
 
+    def autocompletar(self, criterio: str, libros: List[Libro], prefijo: str,
+                      limite: int = 10) -> List[str]:
+        """
+        Completa un prefijo escrito por el usuario.
+
+        Args:
+            criterio: Campo a completar ("titulo" o "autor")
+            libros: Lista de libros donde buscar
+            prefijo: Texto escrito hasta el momento
+            limite: Cantidad maxima de sugerencias
+
+        Returns:
+            Lista de titulos o autores distintos que completan el prefijo
+        """
+        if criterio not in self._autocompletado:
+            raise ValueError(f"Criterio de autocompletado '{criterio}' no soportado. "
+                           f"Criterios disponibles: {list(self._autocompletado.keys())}")
+
+        return self._autocompletado[criterio].completar(libros, prefijo, limite)
+
+    def indexar_libro(self, libro: Libro, libros: List[Libro]) -> None:
+        """
+        Propaga un libro recien agregado al catalogo libros a los indices
+        de las estrategias.
+        """
+        for estrategia in self._estrategias_unicas():
+            estrategia.indexar(libro, libros)
+
+    def reconstruir_indices(self, libros: List[Libro]) -> None:
+        """
+        Invalida los indices de las estrategias para el catalogo dado.
+        """
+        for estrategia in self._estrategias_unicas():
+            estrategia.reconstruir_indice(libros)
+
+    def guardar_indices(self, ruta: str, firma: str, libros: List[Libro]) -> bool:
+        """
+        Persiste como JSON los indices de las estrategias indexadas junto
+        con la firma del catalogo del que provienen. Los libros se guardan
+        por ID y no como copias.
+
+        Args:
+            ruta: Archivo de destino
+            firma: Identificador de la version del catalogo
+            libros: Catalogo sobre el que se construyen los indices
+        """
+        try:
+            estados = {
+                nombre: [type(estrategia).__name__, estrategia.exportar_indice(libros)]
+                for nombre, estrategia in self._estrategias_persistibles().items()
+            }
+
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as f:
+                f.write(self._cabecera_indices(firma))
+                json.dump(estados, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temporal, ruta)
+            return True
+        except Exception as e:
+            print(f"Error al guardar indices: {e}")
+            return False
+
+    def cargar_indices(self, ruta: str, firma: str, libros: List[Libro]) -> bool:
+        """
+        Carga indices persistidos, solo si fueron generados para la misma
+        firma de catalogo. El archivo es JSON, asi que leerlo nunca ejecuta
+        codigo aunque otro proceso con acceso al directorio lo modifique.
+
+        Returns:
+            True si los indices se cargaron; False si no existen, estan
+            desactualizados o no corresponden a las estrategias registradas,
+            en cuyo caso deben reconstruirse
+        """
+        if not os.path.exists(ruta):
+            return False
+
+        indexadas = self._estrategias_persistibles()
+        # Cargar crea millones de objetos pequenos que no forman ciclos; con
+        # el recolector activo, sus pasadas sobre todo el catalogo duplican
+        # el tiempo de carga.
+        recolector_activo = gc.isenabled()
+        gc.disable()
+        try:
+            with open(ruta, 'rb') as f:
+                if f.readline() != self._cabecera_indices(firma).encode('utf-8'):
+                    return False
+                estados = json.load(f)
+
+            if set(estados) != set(indexadas) or any(
+                    type(indexadas[nombre]).__name__ != clase for nombre, (clase, _) in estados.items()):
+                return False
+
+            libros_por_id = {libro.id: libro for libro in libros}
+            for nombre, (_, estado) in estados.items():
+                indexadas[nombre].importar_indice(estado, libros, libros_por_id)
+            return True
+        except Exception as e:
+            print(f"Error al cargar indices: {e}")
+            return False
+        finally:
+            if recolector_activo:
+                gc.enable()
+
+    def _estrategias_persistibles(self) -> Dict[str, BuscadorIndexado]:
+        """
+        Estrategias registradas cuyo indice se persiste.
+        """
+        return {
+            nombre: estrategia for nombre, estrategia in self._estrategias.items()
+            if isinstance(estrategia, BuscadorIndexado) and estrategia._persistible
+        }
+
+    @staticmethod
+    def _cabecera_indices(firma: str) -> str:
+        """Primera linea del archivo de indices: formato y firma del catalogo."""
+        return f"BUSQUEDA-INDICES {_VERSION_FORMATO_INDICES} {firma}\n"
+
+    def _estrategias_unicas(self) -> List[Buscador]:
+        """
+        Retorna cada estrategia una sola vez aunque este registrada con
+        varios nombres.
+        """
+        return list({id(e): e for e in self._estrategias.values()}.values())
+
+    def buscar_lote(self, consultas: Iterable[Tuple[str, str]],
+                    libros: List[Libro]) -> Dict[Tuple[str, str], List[Libro]]:
+        """
+        Ejecuta muchas busquedas a la vez agrupandolas por criterio, de modo
+        que cada estrategia resuelve todas sus consultas de una sola vez.
+
+        Args:
+            consultas: Pares (criterio, valor) a resolver
+            libros: Lista de libros donde buscar
+
+        Returns:
+            Diccionario (criterio, valor) -> lista de libros que coinciden
+        """
+        valores_por_criterio: Dict[str, List[str]] = {}
+        for criterio, valor in consultas:
+            if criterio not in self._estrategias:
+                raise ValueError(f"Criterio de busqueda '{criterio}' no soportado. "
+                               f"Criterios disponibles: {list(self._estrategias.keys())}")
+            valores_por_criterio.setdefault(criterio, []).append(valor)
+
+        resultados = {}
+        for criterio, valores in valores_por_criterio.items():
+            por_valor = self._estrategias[criterio].buscar_lote(libros, dict.fromkeys(valores))
+            for valor, libros_encontrados in por_valor.items():
+                resultados[(criterio, valor)] = libros_encontrados
+        return resultados
+
     def obtener_criterios_disponibles(self) -> List[str]:
         """
         Retorna la lista de criterios de busqueda disponibles.
@@ -135,3 +638,12 @@ class Busqueda:
             Lista de nombres de criterios disponibles
         """
         return list(self._estrategias.keys())
+
+    def obtener_criterios_autocompletado(self) -> List[str]:
+        """
+        Retorna la lista de criterios de autocompletado disponibles.
+
+        Returns:
+            Lista de nombres de campos que se pueden completar
+        """
+        return list(self._autocompletado.keys())
@@ -0,0 +1,235 @@
+"""
+GRABACION Y REPRODUCCION DE CARGA DE TRABAJO
+"""
+
+import argparse
+import gzip
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from typing import Any, Dict, List, Optional
+
+OPERACIONES_GRABADAS = (
+    "agregar_libro",
+    "buscar_libro",
+    "buscar_libros_lote",
+    "autocompletar",
+    "realizar_prestamo",
+    "devolver_libro",
+    "reservar_libro",
+    "cancelar_reserva",
+    "obtener_todos_libros",
+    "obtener_libros_disponibles",
+    "obtener_prestamos_activos",
+)
+
+
+class GrabadorCargaTrabajo:
+    """
+    Envoltorio de SistemaBiblioteca que registra cada operacion en una traza.
+
+    Se usa en lugar del sistema original: delega todas las llamadas y, para
+    las operaciones de OPERACIONES_GRABADAS, agrega a la traza una linea
+    compacta [milisegundos_desde_inicio, operacion, argumentos], con un
+    cuarto elemento {nombre: valor} si la llamada usa argumentos por nombre.
+    La traza es JSON Lines comprimido con gzip. Los argumentos iterables,
+    como un generador de consultas, se convierten en lista antes de grabar,
+    y un error al grabar nunca impide la operacion.
+    """
+    def __init__(self, sistema: Any, ruta_traza: str):
+        """
+        Args:
+            sistema: Sistema de biblioteca a envolver
+            ruta_traza: Archivo donde se escribe la traza (.jsonl.gz)
+        """
+        self._sistema = sistema
+        self._archivo = gzip.open(ruta_traza, 'wt', encoding='utf-8')
+        self._inicio = time.monotonic()
+        self._candado = threading.Lock()
+
+    def __getattr__(self, nombre: str) -> Any:
+        atributo = getattr(self._sistema, nombre)
+        if nombre not in OPERACIONES_GRABADAS or not callable(atributo):
+            return atributo
+
+        def operacion_grabada(*args, **kwargs):
+            args = tuple(_materializar(valor) for valor in args)
+            kwargs = {clave: _materializar(valor) for clave, valor in kwargs.items()}
+            try:
+                self._registrar(nombre, args, kwargs)
+            except Exception as e:
+                print(f"Error al grabar operacion {nombre}: {e}")
+            return atributo(*args, **kwargs)
+
+        return operacion_grabada
+
+    def cerrar(self) -> None:
+        """
+        Cierra la traza; las operaciones posteriores ya no se graban.
+        """
+        with self._candado:
+            if not self._archivo.closed:
+                self._archivo.close()
+
+    def __enter__(self) -> "GrabadorCargaTrabajo":
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
+
+    def _registrar(self, operacion: str, args: tuple, kwargs: Dict[str, Any]) -> None:
+        """
+        Agrega una operacion a la traza.
+        """
+        milisegundos = round((time.monotonic() - self._inicio) * 1000, 3)
+        registro = [milisegundos, operacion, list(args)]
+        if kwargs:
+            registro.append(kwargs)
+        linea = json.dumps(registro, ensure_ascii=False, separators=(",", ":"))
+        with self._candado:
+            if not self._archivo.closed:
+                self._archivo.write(linea + "\n")
+
+
+def _materializar(valor: Any) -> Any:
+    """
+    Convierte un iterable de un solo uso (por ejemplo, un generador) en
+    lista, para poder grabarlo y aun asi pasarlo completo a la operacion.
+    """
+    if isinstance(valor, Iterable) and not isinstance(valor, (str, bytes, dict, list, tuple)):
+        return list(valor)
+    return valor
+
+
+class ReproductorCargaTrabajo:
+    """
+    Reproduce una traza grabada contra un sistema de biblioteca.
+
+    Los IDs de libros y prestamos de la traza solo coinciden si el sistema
+    parte del mismo estado que el sistema grabado (por ejemplo, vacio si la
+    grabacion empezo vacia).
+    """
+    def __init__(self, ruta_traza: str):
+        """
+        Args:
+            ruta_traza: Archivo de traza generado por GrabadorCargaTrabajo
+        """
+        self.ruta_traza = ruta_traza
+
+    def reproducir(self, sistema: Any, velocidad: Optional[float] = 1.0) -> Dict[str, Any]:
+        """
+        Ejecuta la traza sobre el sistema y mide cada operacion.
+
+        Args:
+            sistema: Sistema de biblioteca a ejercitar
+            velocidad: Factor sobre el ritmo original (2.0 = el doble de rapido);
+                       None reproduce sin esperas, lo mas rapido posible
+
+        Returns:
+            Reporte con total de operaciones, duracion, operaciones por
+            segundo y percentiles de latencia global y por operacion
+        """
+        latencias: Dict[str, List[float]] = {}
+        inicio = time.monotonic()
+
+        with gzip.open(self.ruta_traza, 'rt', encoding='utf-8') as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                milisegundos, operacion, args, *resto = json.loads(linea)
+                kwargs = resto[0] if resto else {}
+
+                if velocidad:
+                    espera = inicio + milisegundos / 1000 / velocidad - time.monotonic()
+                    if espera > 0:
+                        time.sleep(espera)
+
+                if operacion == "buscar_libros_lote":
+                    if "consultas" in kwargs:
+                        kwargs["consultas"] = [tuple(consulta) for consulta in kwargs["consultas"]]
+                    else:
+                        args = [[tuple(consulta) for consulta in args[0]]] + args[1:]
+
+                antes = time.perf_counter()
+                resultado = getattr(sistema, operacion)(*args, **kwargs)
+                if isinstance(resultado, Iterable) and not isinstance(resultado, (str, bytes, dict)):
+                    # Los listados retornan vistas perezosas: se recorren para
+                    # medir el trabajo real y no solo la creacion de la vista.
+                    deque(resultado, maxlen=0)
+                latencias.setdefault(operacion, []).append(time.perf_counter() - antes)
+
+        duracion = time.monotonic() - inicio
+        todas = [latencia for muestras in latencias.values() for latencia in muestras]
+        return {
+            "operaciones": len(todas),
+            "duracion_s": duracion,
+            "operaciones_por_segundo": len(todas) / duracion if duracion > 0 else 0.0,
+            "latencia": resumen_latencias(todas),
+            "por_operacion": {
+                operacion: resumen_latencias(muestras)
+                for operacion, muestras in sorted(latencias.items())
+            }
+        }
+
+
+def resumen_latencias(muestras: List[float]) -> Dict[str, float]:
+    """
+    Cantidad y percentiles p50/p95/p99 de latencia, en milisegundos.
+    """
+    if not muestras:
+        return {"cantidad": 0}
+
+    ordenadas = sorted(muestras)
+
+    def percentil(p: float) -> float:
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))] * 1000
+
+    return {
+        "cantidad": len(ordenadas),
+        "p50_ms": percentil(0.50),
+        "p95_ms": percentil(0.95),
+        "p99_ms": percentil(0.99),
+        "max_ms": ordenadas[-1] * 1000
+    }
+
+
+def main():
+    """
+    Reproduce una traza contra un sistema nuevo y muestra el reporte.
+    """
+    from biblioteca import SistemaBiblioteca
+    from busqueda import Busqueda
+    from validador_biblioteca import ValidadorBiblioteca
+    from servicio_notificaciones import ServicioNotificaciones
+    from repositorio_archivo import RepositorioArchivo
+    from repositorio_memoria import RepositorioMemoria
+
+    parser = argparse.ArgumentParser(description="Reproduce una traza de carga de trabajo.")
+    parser.add_argument("traza", help="Archivo de traza (.jsonl.gz)")
+    parser.add_argument("--velocidad", type=float, default=1.0,
+                        help="Factor sobre el ritmo original; 0 para reproducir sin esperas")
+    parser.add_argument("--archivo", help="Usar RepositorioArchivo con esta ruta en lugar de memoria")
+    parser.add_argument("--con-notificaciones", action="store_true",
+                        help="Mantener activas las notificaciones durante la reproduccion")
+    opciones = parser.parse_args()
+
+    notificaciones = ServicioNotificaciones()
+    if not opciones.con_notificaciones:
+        notificaciones.desactivar()
+
+    sistema = SistemaBiblioteca(
+        busqueda=Busqueda(),
+        validador=ValidadorBiblioteca(),
+        repositorio=RepositorioArchivo(opciones.archivo) if opciones.archivo else RepositorioMemoria(),
+        notificaciones=notificaciones
+    )
+
+    reporte = ReproductorCargaTrabajo(opciones.traza).reproducir(sistema, opciones.velocidad or None)
+    sistema.cerrar()
+    print(json.dumps(reporte, indent=2))
+
+
+if __name__ == "__main__":
+    main()
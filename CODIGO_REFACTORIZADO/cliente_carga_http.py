@@ -0,0 +1,157 @@
+"""
+CLIENTE DE PRUEBA DE CARGA HTTP
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from carga_trabajo import resumen_latencias
+
+
+async def _leer_respuesta(lector: asyncio.StreamReader) -> int:
+    """
+    Lee una respuesta completa y retorna su codigo de estado.
+    """
+    cabecera = await lector.readuntil(b"\r\n\r\n")
+    lineas = cabecera.decode("latin-1").split("\r\n")
+    estado = int(lineas[0].split(" ")[1])
+
+    longitud = 0
+    for linea in lineas[1:]:
+        nombre, _, valor = linea.partition(":")
+        if nombre.strip().lower() == "content-length":
+            longitud = int(valor.strip())
+    if longitud:
+        await lector.readexactly(longitud)
+    return estado
+
+
+async def _trabajador(host: str, puerto: int, solicitud: bytes, cantidad: int,
+                      encadenadas: int, latencias: List[float], estados: Dict[int, int]) -> None:
+    """
+    Envia cantidad solicitudes por una sola conexion keep-alive, en rafagas
+    de encadenadas solicitudes sin esperar respuesta (pipelining).
+    """
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        restantes = cantidad
+        while restantes > 0:
+            rafaga = min(encadenadas, restantes)
+            inicio = time.perf_counter()
+            escritor.write(solicitud * rafaga)
+            await escritor.drain()
+            for _ in range(rafaga):
+                estado = await _leer_respuesta(lector)
+                latencias.append(time.perf_counter() - inicio)
+                estados[estado] = estados.get(estado, 0) + 1
+            restantes -= rafaga
+    finally:
+        escritor.close()
+
+
+async def medir(url: str,
+                solicitudes: int = 10000,
+                conexiones: int = 16,
+                encadenadas: int = 1,
+                metodo: str = "GET",
+                cuerpo: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Ejecuta la prueba de carga contra una URL del servicio.
+
+    Args:
+        url: URL completa, por ejemplo http://127.0.0.1:8080/libros/buscar?criterio=autor&valor=garcia
+        solicitudes: Total de solicitudes a enviar
+        conexiones: Conexiones simultaneas
+        encadenadas: Solicitudes enviadas juntas por conexion antes de leer respuestas
+        metodo: Metodo HTTP
+        cuerpo: Objeto a enviar como JSON, si corresponde
+
+    Returns:
+        Solicitudes por segundo, conteo por estado y latencias p50/p95/p99
+        en milisegundos. La latencia de cada solicitud se mide desde el envio
+        de su rafaga hasta recibir su respuesta.
+    """
+    partes = urlsplit(url)
+    ruta = partes.path + (f"?{partes.query}" if partes.query else "")
+    datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+    solicitud = (
+        f"{metodo} {ruta} HTTP/1.1\r\n"
+        f"Host: {partes.hostname}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(datos)}\r\n\r\n"
+    ).encode("latin-1") + datos
+
+    latencias: List[float] = []
+    estados: Dict[int, int] = {}
+    por_conexion, sobrantes = divmod(solicitudes, conexiones)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _trabajador(partes.hostname, partes.port or 80, solicitud,
+                    por_conexion + (1 if i < sobrantes else 0), encadenadas, latencias, estados)
+        for i in range(conexiones)
+    ))
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "solicitudes": len(latencias),
+        "duracion_s": duracion,
+        "solicitudes_por_segundo": len(latencias) / duracion if duracion > 0 else 0.0,
+        "estados": estados,
+        "latencia": resumen_latencias(latencias)
+    }
+
+
+def main():
+    """
+    Mide un servicio en ejecucion o, con --local, uno levantado en este
+    proceso con un catalogo sintetico.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio HTTP de la biblioteca.")
+    parser.add_argument("url", nargs="?", help="URL a medir; se omite con --local")
+    parser.add_argument("--solicitudes", type=int, default=10000)
+    parser.add_argument("--conexiones", type=int, default=16)
+    parser.add_argument("--encadenadas", type=int, default=1, help="Profundidad de pipelining")
+    parser.add_argument("--local", type=int, metavar="LIBROS",
+                        help="Levantar un servicio local con este numero de libros sinteticos")
+    opciones = parser.parse_args()
+
+    if opciones.local is None and not opciones.url:
+        parser.error("Indique una URL o use --local")
+
+    async def ejecutar() -> Dict[str, Any]:
+        if opciones.local is None:
+            return await medir(opciones.url, opciones.solicitudes, opciones.conexiones, opciones.encadenadas)
+
+        from benchmark_biblioteca import generar_catalogo
+        from biblioteca import SistemaBiblioteca
+        from busqueda import Busqueda
+        from validador_biblioteca import ValidadorBiblioteca
+        from servicio_notificaciones import ServicioNotificaciones
+        from repositorio_memoria import RepositorioMemoria
+        from servicio_http import ServidorBiblioteca
+
+        notificaciones = ServicioNotificaciones()
+        notificaciones.desactivar()
+        sistema = SistemaBiblioteca(Busqueda(), ValidadorBiblioteca(), RepositorioMemoria(), notificaciones)
+        catalogo = generar_catalogo(opciones.local)
+        sistema.agregar_libros_lote([(libro.titulo, libro.autor, libro.isbn) for libro in catalogo])
+
+        servidor = ServidorBiblioteca(sistema, puerto=0)
+        await servidor.iniciar()
+        try:
+            url = opciones.url or (f"http://127.0.0.1:{servidor.puerto}/libros/buscar"
+                                   f"?criterio=isbn&valor={catalogo[len(catalogo) // 2].isbn}")
+            return await medir(url, opciones.solicitudes, opciones.conexiones, opciones.encadenadas)
+        finally:
+            await servidor.detener()
+
+    print(json.dumps(asyncio.run(ejecutar()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+EVENTOS DEL SISTEMA DE BIBLIOTECA
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class EstadoEventos:
+    """
+    Estado persistido (el mismo diccionario que retorna cargar_datos) con
+    accesos por ID para aplicar eventos sin recorrer listas.
+    """
+    def __init__(self, datos: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            datos: Estado de partida, normalmente el de una instantanea
+        """
+        datos = datos or {}
+        self.libros: List[Dict[str, Any]] = datos.get("libros", [])
+        self.prestamos: List[Dict[str, Any]] = datos.get("prestamos", [])
+        contadores = datos.get("contadores", {})
+        self.contador_libro = contadores.get("libro", 1)
+        self.contador_prestamo = contadores.get("prestamo", 1)
+
+        self.libros_por_id = {libro["id"]: libro for libro in self.libros}
+        self.prestamos_por_id = {prestamo["id"]: prestamo for prestamo in self.prestamos}
+        self.colas: Dict[int, Deque[str]] = {}
+        self.apartados: Dict[int, str] = {}
+        for reserva in datos.get("reservas", []):
+            if reserva.get("cola"):
+                self.colas[reserva["libro_id"]] = deque(reserva["cola"])
+            if reserva.get("apartado_para"):
+                self.apartados[reserva["libro_id"]] = reserva["apartado_para"]
+        self._prestamos_retirados = set()
+
+    def retirar_prestamo(self, prestamo_id: int) -> None:
+        """
+        Marca un prestamo para quitarlo del estado (por ejemplo, archivado).
+        """
+        self.prestamos_por_id.pop(prestamo_id, None)
+        self._prestamos_retirados.add(prestamo_id)
+
+    def entregar_a_siguiente(self, libro_id: int, usuario: Optional[str]) -> None:
+        """
+        Aparta el libro para el siguiente de la cola, o lo deja disponible
+        si usuario es None.
+        """
+        if usuario is None:
+            libro = self.libros_por_id.get(libro_id)
+            if libro:
+                libro["disponible"] = True
+            return
+
+        cola = self.colas.get(libro_id)
+        if cola:
+            cola.popleft()
+            if not cola:
+                del self.colas[libro_id]
+        self.apartados[libro_id] = usuario
+
+    def a_dict(self) -> Dict[str, Any]:
+        """
+        Estado en el formato de cargar_datos.
+        """
+        prestamos = self.prestamos
+        if self._prestamos_retirados:
+            prestamos = [p for p in prestamos if p["id"] not in self._prestamos_retirados]
+        return {
+            "libros": self.libros,
+            "prestamos": prestamos,
+            "reservas": [
+                {
+                    "libro_id": libro_id,
+                    "cola": list(self.colas.get(libro_id, ())),
+                    "apartado_para": self.apartados.get(libro_id)
+                }
+                for libro_id in sorted(self.colas.keys() | self.apartados.keys())
+            ],
+            "contadores": {"libro": self.contador_libro, "prestamo": self.contador_prestamo}
+        }
+
+
+class Evento(ABC):
+    """
+    Cambio de estado registrado en el log. Cada subclase sabe aplicarse
+    sobre un EstadoEventos.
+    """
+    @abstractmethod
+    def aplicar(self, estado: EstadoEventos) -> None:
+        """Aplica el cambio sobre el estado."""
+        pass
+
+    def a_dict(self) -> Dict[str, Any]:
+        """Representacion persistida, con el nombre del tipo de evento."""
+        return {"tipo": type(self).__name__, **asdict(self)}
+
+    def libros_afectados(self) -> Tuple[int, ...]:
+        """IDs de los libros cuyo registro cambia con el evento."""
+        return ()
+
+    def prestamos_afectados(self) -> Tuple[int, ...]:
+        """IDs de los prestamos cuyo registro cambia o desaparece."""
+        return ()
+
+
+@dataclass
+class LibroAgregado(Evento):
+    id: int
+    titulo: str
+    autor: str
+    isbn: str
+
+    def aplicar(self, estado: EstadoEventos) -> None:
+        libro = {"id": self.id, "titulo": self.titulo, "autor": self.autor,
+                 "isbn": self.isbn, "disponible": True}
+        estado.libros.append(libro)
+        estado.libros_por_id[self.id] = libro
+        estado.contador_libro = max(estado.contador_libro, self.id + 1)
+
+    def libros_afectados(self) -> Tuple[int, ...]:
+        return (self.id,)
+
+
+@dataclass
+class PrestamoRealizado(Evento):
+    id: int
+    libro_id: int
+    usuario: str
+    fecha: str
+    fecha_vencimiento: Optional[str]
+
+    def aplicar(self, estado: EstadoEventos) -> None:
+        prestamo = {"id": self.id, "libro_id": self.libro_id, "usuario": self.usuario,
+                    "devuelto": False, "fecha": self.fecha,
+                    "fecha_vencimiento": self.fecha_vencimiento,
+                    "recordatorio_enviado": False, "fecha_devolucion": None}
+        estado.prestamos.append(prestamo)
+        estado.prestamos_por_id[self.id] = prestamo
+        estado.apartados.pop(self.libro_id, None)
+        libro = estado.libros_por_id.get(self.libro_id)
+        if libro:
+            libro["disponible"] = False
+        estado.contador_prestamo = max(estado.contador_prestamo, self.id + 1)
+
+    def libros_afectados(self) -> Tuple[int, ...]:
+        return (self.libro_id,)
+
+    def prestamos_afectados(self) -> Tuple[int, ...]:
+        return (self.id,)
+
+
+@dataclass
+class LibroDevuelto(Evento):
+    prestamo_id: int
+    libro_id: int
+    fecha_devolucion: str
+    apartado_para: Optional[str] = None
+    archivado: bool = False
+
+    def aplicar(self, estado: EstadoEventos) -> None:
+        prestamo = estado.prestamos_por_id.get(self.prestamo_id)
+        if prestamo:
+            prestamo["devuelto"] = True
+            prestamo["fecha_devolucion"] = self.fecha_devolucion
+        if self.archivado:
+            estado.retirar_prestamo(self.prestamo_id)
+        estado.entregar_a_siguiente(self.libro_id, self.apartado_para)
+
+    def libros_afectados(self) -> Tuple[int, ...]:
+        return (self.libro_id,)
+
+    def prestamos_afectados(self) -> Tuple[int, ...]:
+        return (self.prestamo_id,)
+
+
+@dataclass
+class ReservaRegistrada(Evento):
+    libro_id: int
+    usuario: str
+
+    def aplicar(self, estado: EstadoEventos) -> None:
+        estado.colas.setdefault(self.libro_id, deque()).append(self.usuario)
+
+
+@dataclass
+class ReservaCancelada(Evento):
+    libro_id: int
+    usuario: str
+    apartado_para: Optional[str] = None
+
+    def aplicar(self, estado: EstadoEventos) -> None:
+        if estado.apartados.get(self.libro_id) == self.usuario:
+            del estado.apartados[self.libro_id]
+            estado.entregar_a_siguiente(self.libro_id, self.apartado_para)
+            return
+
+        cola = estado.colas.get(self.libro_id)
+        if cola and self.usuario in cola:
+            cola.remove(self.usuario)
+            if not cola:
+                del estado.colas[self.libro_id]
+
+    def libros_afectados(self) -> Tuple[int, ...]:
+        return (self.libro_id,)
+
+
+@dataclass
+class RecordatorioEnviado(Evento):
+    prestamo_id: int
+
+    def aplicar(self, estado: EstadoEventos) -> None:
+        prestamo = estado.prestamos_por_id.get(self.prestamo_id)
+        if prestamo:
+            prestamo["recordatorio_enviado"] = True
+
+    def prestamos_afectados(self) -> Tuple[int, ...]:
+        return (self.prestamo_id,)
+
+
+TIPOS_EVENTO = {
+    tipo.__name__: tipo
+    for tipo in (LibroAgregado, PrestamoRealizado, LibroDevuelto,
+                 ReservaRegistrada, ReservaCancelada, RecordatorioEnviado)
+}
+
+
+def evento_desde_dict(datos: Dict[str, Any]) -> Evento:
+    """
+    Reconstruye un evento a partir de su representacion persistida.
+    """
+    datos = dict(datos)
+    tipo = TIPOS_EVENTO.get(datos.pop("tipo", None))
+    if tipo is None:
+        raise ValueError(f"Tipo de evento desconocido en {datos}")
+    datos.pop("secuencia", None)
+    datos.pop("registrado", None)
+    return tipo(**datos)
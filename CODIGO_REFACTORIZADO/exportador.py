@@ -0,0 +1,78 @@
+"""
+EXPORTADOR DE LIBROS Y PRESTAMOS
+"""
+
+import csv
+import gzip
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, IO, Iterable, Optional, Sequence
+from importador_catalogo import FORMATOS_SOPORTADOS, detectar_formato
+
+CAMPOS_LIBRO = ("id", "titulo", "autor", "isbn", "disponible")
+CAMPOS_PRESTAMO = ("id", "libro_id", "usuario", "fecha", "fecha_vencimiento",
+                   "devuelto", "fecha_devolucion", "recordatorio_enviado")
+
+
+def a_registro(elemento: Any, campos: Sequence[str]) -> Dict[str, Any]:
+    """
+    Convierte un libro o prestamo, objeto o diccionario, en un registro
+    con exactamente los campos indicados.
+    """
+    if isinstance(elemento, Mapping):
+        return {campo: elemento.get(campo) for campo in campos}
+    return {campo: getattr(elemento, campo, None) for campo in campos}
+
+
+def escribir_csv(elementos: Iterable[Any], destino: IO[str], campos: Sequence[str]) -> int:
+    """
+    Escribe los elementos como CSV con encabezado a medida que se recorren.
+    Retorna la cantidad de registros escritos.
+    """
+    escritor = csv.DictWriter(destino, fieldnames=campos)
+    escritor.writeheader()
+    cantidad = 0
+    for elemento in elementos:
+        escritor.writerow(a_registro(elemento, campos))
+        cantidad += 1
+    return cantidad
+
+
+def escribir_jsonl(elementos: Iterable[Any], destino: IO[str], campos: Sequence[str]) -> int:
+    """
+    Escribe los elementos como JSON Lines a medida que se recorren.
+    Retorna la cantidad de registros escritos.
+    """
+    cantidad = 0
+    for elemento in elementos:
+        destino.write(json.dumps(a_registro(elemento, campos), ensure_ascii=False) + "\n")
+        cantidad += 1
+    return cantidad
+
+
+_ESCRITORES = {"csv": escribir_csv, "jsonl": escribir_jsonl}
+
+
+def exportar(elementos: Iterable[Any], ruta: str, campos: Sequence[str],
+             formato: Optional[str] = None) -> int:
+    """
+    Exporta un flujo de libros o prestamos a un archivo CSV o JSON Lines,
+    comprimido con gzip si la ruta termina en ".gz". Solo se mantiene en
+    memoria el registro en curso.
+
+    Args:
+        elementos: Objetos o diccionarios a exportar, normalmente un generador
+        ruta: Archivo de destino
+        campos: Campos a exportar, en orden (CAMPOS_LIBRO o CAMPOS_PRESTAMO)
+        formato: "csv" o "jsonl"; por defecto se deduce de la extension
+
+    Returns:
+        Cantidad de registros exportados
+    """
+    formato = formato or detectar_formato(ruta)
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato '{formato}' no soportado. Formatos: {FORMATOS_SOPORTADOS}")
+
+    abrir = gzip.open if ruta.endswith(".gz") else open
+    with abrir(ruta, 'wt', encoding='utf-8', newline='') as destino:
+        return _ESCRITORES[formato](elementos, destino, campos)
@@ -0,0 +1,202 @@
+"""
+IMPORTADOR DE CATALOGOS
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+FORMATOS_SOPORTADOS = ("csv", "jsonl")
+
+
+@dataclass
+class ResultadoImportacion:
+    filas_leidas: int = 0
+    agregados: int = 0
+    rechazados: int = 0
+    bytes_leidos: int = 0
+    bytes_totales: int = 0
+    segundos: float = 0.0
+    errores: List[Tuple[int, List[str]]] = field(default_factory=list)
+
+    @property
+    def porcentaje(self) -> float:
+        """Avance de la lectura del archivo, de 0 a 100."""
+        if not self.bytes_totales:
+            return 100.0
+        return min(100.0, self.bytes_leidos * 100 / self.bytes_totales)
+
+
+def detectar_formato(ruta: str) -> str:
+    """
+    Deduce el formato a partir de la extension, ignorando un ".gz" final.
+    """
+    nombre = ruta[:-3] if ruta.endswith(".gz") else ruta
+    extension = os.path.splitext(nombre)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"No se puede deducir el formato de '{ruta}'. Formatos: {FORMATOS_SOPORTADOS}")
+
+
+def leer_csv(archivo: IO[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre un CSV con encabezado titulo,autor,isbn fila por fila.
+    """
+    yield from csv.DictReader(archivo)
+
+
+def leer_jsonl(archivo: IO[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre un archivo JSON Lines objeto por objeto. Las lineas que no son
+    JSON valido se entregan como filas vacias para que la validacion las
+    rechace sin detener la importacion.
+    """
+    for linea in archivo:
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except json.JSONDecodeError:
+            fila = {}
+        yield fila if isinstance(fila, dict) else {}
+
+
+_LECTORES = {"csv": leer_csv, "jsonl": leer_jsonl}
+
+
+class ImportadorCatalogo:
+    """
+    Importa catalogos de editoriales en CSV o JSON Lines como flujo.
+
+    Lee el archivo fila por fila y agrega los libros en lotes de tamano_lote
+    mediante SistemaBiblioteca.agregar_libros_lote, que valida el lote en una
+    pasada y persiste una sola vez. El importador solo retiene el lote en
+    curso y una muestra acotada de errores, por lo que su memoria no depende
+    del tamano del archivo. Los indices de busqueda se guardan una sola vez,
+    al terminar.
+
+    Cada lote reescribe el archivo de datos completo, asi que el costo de un
+    lote crece con el catalogo ya cargado y el de toda la importacion es
+    cuadratico en la cantidad de lotes; para catalogos grandes conviene un
+    tamano_lote mayor.
+    """
+    def __init__(self,
+                 sistema: Any,
+                 tamano_lote: int = 5000,
+                 progreso: Optional[Callable[[ResultadoImportacion], None]] = None,
+                 max_errores_reportados: int = 100):
+        """
+        Args:
+            sistema: SistemaBiblioteca que recibe los libros
+            tamano_lote: Filas por lote validado y persistido
+            progreso: Funcion llamada tras cada lote con el resultado parcial
+            max_errores_reportados: Filas rechazadas cuyos errores se conservan como muestra
+        """
+        if tamano_lote < 1:
+            raise ValueError("El tamano de lote debe ser mayor que 0")
+
+        self.sistema = sistema
+        self.tamano_lote = tamano_lote
+        self.progreso = progreso
+        self.max_errores_reportados = max_errores_reportados
+
+    def importar(self, ruta: str, formato: Optional[str] = None) -> ResultadoImportacion:
+        """
+        Importa el archivo indicado. Los archivos terminados en ".gz" se
+        descomprimen al vuelo.
+
+        Args:
+            ruta: Archivo CSV o JSON Lines, opcionalmente comprimido
+            formato: "csv" o "jsonl"; por defecto se deduce de la extension
+
+        Returns:
+            Resultado con conteos, avance y una muestra de errores
+            (numero_fila, mensaje), con filas numeradas desde 1
+        """
+        formato = formato or detectar_formato(ruta)
+        if formato not in _LECTORES:
+            raise ValueError(f"Formato '{formato}' no soportado. Formatos: {FORMATOS_SOPORTADOS}")
+
+        resultado = ResultadoImportacion(bytes_totales=os.path.getsize(ruta))
+        inicio = time.monotonic()
+
+        with open(ruta, 'rb') as binario:
+            crudo = gzip.GzipFile(fileobj=binario) if ruta.endswith(".gz") else binario
+            with io.TextIOWrapper(crudo, encoding='utf-8-sig', newline='') as archivo:
+                filas = _LECTORES[formato](archivo)
+                while True:
+                    lote = list(itertools.islice(filas, self.tamano_lote))
+                    if not lote:
+                        break
+
+                    primera_fila = resultado.filas_leidas + 1
+                    agregados, errores = self.sistema.agregar_libros_lote(lote)
+
+                    resultado.filas_leidas += len(lote)
+                    resultado.agregados += agregados
+                    resultado.rechazados += len(errores)
+                    for indice, mensajes in errores:
+                        if len(resultado.errores) >= self.max_errores_reportados:
+                            break
+                        resultado.errores.append((primera_fila + indice, mensajes))
+
+                    resultado.bytes_leidos = binario.tell()
+                    resultado.segundos = time.monotonic() - inicio
+                    if self.progreso:
+                        self.progreso(resultado)
+
+        self.sistema.guardar_indices()
+        resultado.bytes_leidos = resultado.bytes_totales
+        resultado.segundos = time.monotonic() - inicio
+        return resultado
+
+
+def main():
+    """
+    Importa un catalogo a un repositorio en archivo mostrando el avance.
+    """
+    import argparse
+    from biblioteca import SistemaBiblioteca
+    from busqueda import Busqueda
+    from validador_biblioteca import ValidadorBiblioteca
+    from servicio_notificaciones import ServicioNotificaciones
+    from repositorio_archivo import RepositorioArchivo
+
+    parser = argparse.ArgumentParser(description="Importa un catalogo CSV o JSON Lines.")
+    parser.add_argument("catalogo", help="Archivo .csv o .jsonl, opcionalmente .gz")
+    parser.add_argument("destino", help="Archivo JSON del repositorio de la biblioteca")
+    parser.add_argument("--formato", choices=FORMATOS_SOPORTADOS)
+    parser.add_argument("--lote", type=int, default=5000, help="Filas por lote")
+    opciones = parser.parse_args()
+
+    notificaciones = ServicioNotificaciones()
+    notificaciones.desactivar()
+    sistema = SistemaBiblioteca(
+        busqueda=Busqueda(),
+        validador=ValidadorBiblioteca(),
+        repositorio=RepositorioArchivo(opciones.destino),
+        notificaciones=notificaciones
+    )
+
+    def mostrar_avance(resultado: ResultadoImportacion) -> None:
+        print(f"{resultado.porcentaje:5.1f}% - {resultado.filas_leidas:,} filas, "
+              f"{resultado.agregados:,} agregadas, {resultado.rechazados:,} rechazadas")
+
+    resultado = ImportadorCatalogo(sistema, opciones.lote, mostrar_avance).importar(
+        opciones.catalogo, opciones.formato)
+
+    print(f"Importacion terminada en {resultado.segundos:.1f} s")
+    for fila, mensajes in resultado.errores:
+        print(f"- Fila {fila}: {'; '.join(mensajes)}")
+
+
+if __name__ == "__main__":
+    main()
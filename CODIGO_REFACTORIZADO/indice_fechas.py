@@ -0,0 +1,87 @@
+"""
+INDICE DE FECHAS DE PRESTAMOS
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+Fecha = Union[date, str]
+
+
+def a_ordinal(fecha: Any) -> Optional[int]:
+    """
+    Convierte una fecha (date o "%Y-%m-%d") a su ordinal de dia. Retorna
+    None para valores que no son fechas, como los False de registros
+    antiguos.
+    """
+    if isinstance(fecha, date):
+        return fecha.toordinal()
+    try:
+        return date.fromisoformat(fecha).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class IndiceFechas:
+    """
+    Pares (dia_ordinal, prestamo_id) ordenados para consultas por rango
+    de fechas con bisect.
+
+    Los prestamos nuevos casi siempre tienen la fecha mas reciente, asi que
+    agregarlos suele ser un append; borrar cuesta una busqueda binaria mas
+    el desplazamiento de la lista.
+    """
+    def __init__(self):
+        """
+        Inicializa el indice vacio.
+        """
+        self._entradas: List[Tuple[int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def agregar(self, dia: Optional[int], prestamo_id: int) -> None:
+        """
+        Indexa un prestamo; los prestamos sin fecha valida se ignoran.
+        """
+        if dia is None:
+            return
+        entrada = (dia, prestamo_id)
+        if not self._entradas or entrada >= self._entradas[-1]:
+            self._entradas.append(entrada)
+        else:
+            insort(self._entradas, entrada)
+
+    def quitar(self, dia: Optional[int], prestamo_id: int) -> None:
+        """
+        Quita un prestamo del indice si estaba.
+        """
+        if dia is None:
+            return
+        entrada = (dia, prestamo_id)
+        posicion = bisect_left(self._entradas, entrada)
+        if posicion < len(self._entradas) and self._entradas[posicion] == entrada:
+            del self._entradas[posicion]
+
+    def reconstruir(self, entradas: Iterable[Tuple[Optional[int], int]]) -> None:
+        """
+        Reemplaza el contenido por los pares (dia, prestamo_id) dados.
+        """
+        self._entradas = sorted(entrada for entrada in entradas if entrada[0] is not None)
+
+    def en_rango(self, desde: int, hasta: int) -> List[int]:
+        """
+        IDs de prestamo con dia entre desde y hasta, ambos incluidos,
+        ordenados por fecha.
+        """
+        inicio = bisect_left(self._entradas, (desde,))
+        fin = bisect_right(self._entradas, (hasta, float("inf")))
+        return [prestamo_id for _, prestamo_id in self._entradas[inicio:fin]]
+
+    def anteriores_a(self, dia: int) -> List[int]:
+        """
+        IDs de prestamo con dia estrictamente anterior al indicado.
+        """
+        fin = bisect_left(self._entradas, (dia,))
+        return [prestamo_id for _, prestamo_id in self._entradas[:fin]]
@@ -0,0 +1,240 @@
+"""
+INDICES DE BUSQUEDA
+"""
+
+import bisect
+import itertools
+import re
+from typing import Dict, Generic, Iterator, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_PATRON_PALABRA = re.compile(r"\w+")
+
+
+def extraer_palabras(texto: str) -> List[str]:
+    """
+    Divide un texto ya normalizado en sus palabras.
+    """
+    return _PATRON_PALABRA.findall(texto)
+
+
+def distancia_edicion(a: str, b: str, maximo: int) -> int:
+    """
+    Distancia de Levenshtein entre dos cadenas (inserciones, borrados y
+    sustituciones). Deja de calcular en cuanto la distancia supera maximo
+    y en ese caso retorna maximo + 1.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, caracter_a in enumerate(a, 1):
+        actual = [i]
+        for j, caracter_b in enumerate(b, 1):
+            actual.append(min(
+                anterior[j] + 1,
+                actual[j - 1] + 1,
+                anterior[j - 1] + (caracter_a != caracter_b)
+            ))
+        if min(actual) > maximo:
+            return maximo + 1
+        anterior = actual
+    return min(anterior[-1], maximo + 1)
+
+
+def _trigramas(termino: str) -> Set[str]:
+    """
+    Trigramas distintos del termino, con relleno para que los extremos
+    tambien generen trigramas propios.
+    """
+    relleno = f"  {termino}  "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceTrigramas(Generic[T]):
+    """
+    Indice de terminos por trigramas para busqueda aproximada.
+
+    Una edicion destruye como mucho tres trigramas, asi que un termino a
+    distancia k de la consulta comparte al menos len(trigramas) - 3k
+    trigramas con ella. Solo los terminos que superan ese umbral se
+    verifican con la distancia de edicion; el costo depende del tamano de
+    las listas de trigramas consultadas y no del vocabulario completo.
+    """
+    def __init__(self):
+        """
+        Inicializa un indice vacio.
+        """
+        self._terminos: List[str] = []
+        self._valores: List[T] = []
+        self._posiciones: Dict[str, int] = {}
+        self._por_trigrama: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._terminos)
+
+    def agregar(self, termino: str, valor: T) -> None:
+        """
+        Agrega un termino con su valor asociado. Si el termino ya existe,
+        se conserva el valor original.
+        """
+        if termino in self._posiciones:
+            return
+
+        posicion = len(self._terminos)
+        self._posiciones[termino] = posicion
+        self._terminos.append(termino)
+        self._valores.append(valor)
+        for trigrama in _trigramas(termino):
+            self._por_trigrama.setdefault(trigrama, []).append(posicion)
+
+    def buscar(self, termino: str, distancia_maxima: int) -> List[Tuple[int, str, T]]:
+        """
+        Retorna los terminos a distancia menor o igual a distancia_maxima,
+        como tuplas (distancia, termino, valor) ordenadas por distancia.
+        """
+        trigramas = _trigramas(termino)
+        minimo_compartidos = len(trigramas) - 3 * distancia_maxima
+
+        compartidos: Dict[int, int] = {}
+        for trigrama in trigramas:
+            for posicion in self._por_trigrama.get(trigrama, ()):
+                compartidos[posicion] = compartidos.get(posicion, 0) + 1
+
+        resultados = []
+        for posicion, cantidad in compartidos.items():
+            if cantidad < minimo_compartidos:
+                continue
+            candidato = self._terminos[posicion]
+            distancia = distancia_edicion(termino, candidato, distancia_maxima)
+            if distancia <= distancia_maxima:
+                resultados.append((distancia, candidato, self._valores[posicion]))
+
+        resultados.sort(key=lambda resultado: (resultado[0], resultado[1]))
+        return resultados
+
+    def exportar(self) -> Dict[str, object]:
+        """
+        Estructuras del indice para persistirlo como JSON. Los valores no se
+        incluyen: quien lo persiste los guarda en el orden de los terminos.
+        """
+        return {"terminos": self._terminos, "por_trigrama": self._por_trigrama}
+
+    @classmethod
+    def importar(cls, estado: Dict[str, object], valores: List[T]) -> "IndiceTrigramas[T]":
+        """
+        Reconstruye un indice exportado, con un valor por termino en orden.
+        """
+        if len(estado["terminos"]) != len(valores):
+            raise ValueError("La cantidad de valores no coincide con la de terminos")
+        indice = cls()
+        indice._terminos = list(estado["terminos"])
+        indice._valores = list(valores)
+        indice._posiciones = {termino: posicion for posicion, termino in enumerate(indice._terminos)}
+        indice._por_trigrama = dict(estado["por_trigrama"])
+        return indice
+
+
+class IndicePrefijos(Generic[T]):
+    """
+    Indice ordenado de claves para completar prefijos con bisect.
+
+    Cada valor se indexa por su clave completa y por cada sufijo que empieza
+    en una palabra, de modo que "marq" completa "gabriel garcia marquez".
+    Una consulta cuesta O(log n) para ubicar el prefijo mas O(k) para leer
+    los resultados contiguos.
+    """
+    def __init__(self):
+        """
+        Inicializa un indice vacio.
+        """
+        self._claves: List[Tuple[str, int]] = []
+        self._pendientes: List[Tuple[str, int]] = []
+        self._valores: List[T] = []
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def agregar(self, clave: str, valor: T) -> None:
+        """
+        Agrega un valor indexado por la clave y por sus sufijos de palabra.
+        Las claves se ordenan en la siguiente consulta.
+        """
+        posicion = len(self._valores)
+        self._valores.append(valor)
+        for inicio in {m.start() for m in _PATRON_PALABRA.finditer(clave)} | {0}:
+            self._pendientes.append((clave[inicio:], posicion))
+
+    def buscar(self, prefijo: str, limite: Optional[int] = None) -> List[T]:
+        """
+        Retorna los valores distintos con alguna clave que empiece por el
+        prefijo, en orden de clave, hasta un maximo de limite.
+        """
+        return list(itertools.islice(self.iterar(prefijo), limite))
+
+    def iterar(self, prefijo: str) -> Iterator[T]:
+        """
+        Recorre de forma perezosa los valores distintos que completan el
+        prefijo, en orden de clave.
+        """
+        self._consolidar()
+
+        vistos = set()
+        claves = self._claves
+        for indice in range(bisect.bisect_left(claves, (prefijo,)), len(claves)):
+            clave, posicion = claves[indice]
+            if not clave.startswith(prefijo):
+                break
+            if posicion not in vistos:
+                vistos.add(posicion)
+                yield self._valores[posicion]
+
+    def exportar(self) -> Dict[str, object]:
+        """
+        Orden de las claves para persistir el indice como JSON, de modo que
+        al cargarlo la primera consulta no tenga que ordenarlas. Cada clave
+        es un sufijo de la clave completa de su valor, asi que se guarda
+        solo como el par posicion, largo en una lista plana de enteros.
+        """
+        self._consolidar()
+        orden = []
+        for clave, posicion in self._claves:
+            orden.append(posicion)
+            orden.append(len(clave))
+        return {"orden": orden}
+
+    @classmethod
+    def importar(cls, estado: Dict[str, object], claves: List[str],
+                 valores: List[T]) -> "IndicePrefijos[T]":
+        """
+        Reconstruye un indice exportado a partir de la clave completa y el
+        valor de cada posicion, en orden de posicion.
+        """
+        if len(claves) != len(valores):
+            raise ValueError("La cantidad de valores no coincide con la de claves")
+        orden = estado["orden"]
+        indice = cls()
+        indice._claves = [
+            (claves[posicion][len(claves[posicion]) - largo:], posicion)
+            for posicion, largo in zip(orden[::2], orden[1::2])
+        ]
+        indice._valores = list(valores)
+        return indice
+
+    def _consolidar(self) -> None:
+        """
+        Incorpora las claves pendientes: pocas se insertan con bisect y una
+        carga masiva se ordena de una vez.
+        """
+        if not self._pendientes:
+            return
+
+        if len(self._pendientes) * 16 > len(self._claves):
+            self._claves.extend(self._pendientes)
+            self._claves.sort()
+        else:
+            for entrada in self._pendientes:
+                bisect.insort(self._claves, entrada)
+        self._pendientes = []
@@ -0,0 +1,57 @@
+"""
+INTERNADO DE CADENAS
+"""
+
+import sys
+from typing import Any, Dict, Optional
+
+
+class InternadorCadenas:
+    """
+    Tabla de cadenas compartidas para valores que se repiten mucho, como
+    autores, usuarios y fechas.
+
+    Cada valor distinto se guarda una sola vez; las apariciones posteriores
+    reciben el mismo objeto y la copia nueva puede liberarse. A diferencia de
+    sys.intern, la tabla pertenece al sistema que la usa y lleva estadisticas
+    de la memoria ahorrada.
+    """
+    def __init__(self):
+        """
+        Inicializa la tabla vacia y sus estadisticas.
+        """
+        self._cadenas: Dict[str, str] = {}
+        self.consultas = 0
+        self.reutilizadas = 0
+        self.bytes_ahorrados = 0
+
+    def __len__(self) -> int:
+        return len(self._cadenas)
+
+    def internar(self, texto: Optional[str]) -> Optional[str]:
+        """
+        Retorna la instancia compartida de texto, registrandola si es nueva.
+        Los valores que no son cadenas se retornan sin cambios.
+        """
+        if not isinstance(texto, str):
+            return texto
+
+        self.consultas += 1
+        existente = self._cadenas.setdefault(texto, texto)
+        if existente is not texto:
+            self.reutilizadas += 1
+            self.bytes_ahorrados += sys.getsizeof(texto)
+        return existente
+
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """
+        Resume el uso de la tabla y la memoria ahorrada por las copias
+        que ya no se conservan.
+        """
+        return {
+            "cadenas_unicas": len(self._cadenas),
+            "consultas": self.consultas,
+            "reutilizadas": self.reutilizadas,
+            "bytes_ahorrados": self.bytes_ahorrados,
+            "bytes_tabla": sum(sys.getsizeof(texto) for texto in self._cadenas)
+        }
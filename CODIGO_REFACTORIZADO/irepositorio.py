@@ -3,7 +3,8 @@ INTERFAZ REPOSITORIO
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from contextlib import nullcontext
+from typing import List, Dict, Any, Iterator, Optional
 
 class IRepositorio(ABC):
     """
@@ -11,9 +12,11 @@ class IRepositorio(ABC):
     """
     @abstractmethod
     def guardar_datos(self, libros: List[Any], prestamos: List[Any], 
-                     contador_libro: int, contador_prestamo: int) -> bool:
+                     contador_libro: int, contador_prestamo: int,
+                     reservas: Optional[List[Dict[str, Any]]] = None) -> bool:
         """
-        Guarda todos los datos del sistema.
+        Guarda todos los datos del sistema. reservas son las colas de espera
+        por libro como diccionarios {"libro_id", "cola", "apartado_para"}.
         """
         pass
 
@@ -30,3 +33,61 @@ class IRepositorio(ABC):
         Limpia todos los datos del repositorio.
         """
         pass
+
+    def ruta_indices(self) -> Optional[str]:
+        """
+        Ruta donde persistir los indices de busqueda junto a los datos, o
+        None si el repositorio no los conserva entre ejecuciones.
+        """
+        return None
+
+    def transaccion(self):
+        """
+        Contexto que serializa una operacion de lectura-modificacion-escritura
+        frente a otros procesos. Por defecto no hace nada.
+        """
+        return nullcontext()
+
+    def hay_cambios_externos(self) -> bool:
+        """
+        Indica si otro proceso modifico los datos desde la ultima carga o
+        escritura de esta instancia. Por defecto nunca ocurre.
+        """
+        return False
+
+    def registrar_evento(self, evento: Any) -> bool:
+        """
+        Registra un evento de dominio antes de guardar_datos. Los
+        repositorios basados en eventos lo agregan a su log; por defecto
+        se ignora y el estado se persiste solo con guardar_datos.
+        """
+        return True
+
+    def leer_cambios_externos(self) -> Optional[Dict[str, Any]]:
+        """
+        Cambios que otros procesos guardaron desde la ultima carga o
+        escritura, en el formato de cargar_datos pero solo con los libros y
+        prestamos que cambiaron, mas "prestamos_quitados" con los IDs de los
+        que ya no estan. Retorna None si no puede saberlos sin cargar todo;
+        es lo que hace por defecto.
+        """
+        return None
+
+    def iterar_libros(self, disponible: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los libros guardados, opcionalmente solo los que tienen la
+        disponibilidad indicada. Por defecto usa cargar_datos; los
+        repositorios que pueden leer registro a registro lo redefinen.
+        """
+        for libro in (self.cargar_datos() or {}).get("libros", []):
+            if disponible is None or libro.get("disponible") == disponible:
+                yield libro
+
+    def iterar_prestamos(self, devuelto: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los prestamos guardados, opcionalmente filtrados por estado
+        de devolucion.
+        """
+        for prestamo in (self.cargar_datos() or {}).get("prestamos", []):
+            if devuelto is None or prestamo.get("devuelto") == devuelto:
+                yield prestamo
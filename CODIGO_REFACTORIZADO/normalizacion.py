@@ -0,0 +1,28 @@
+"""
+NORMALIZACION DE TEXTO
+"""
+
+import unicodedata
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Genera la clave de busqueda de un texto: sin acentos y en casefold.
+
+    Permite que "Garcia" coincida con "García" y que las comparaciones no
+    dependan de mayusculas, minusculas ni de reglas especiales como la "ß".
+    """
+    if texto.isascii():
+        return texto.lower()
+
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def normalizar_isbn(isbn: str) -> str:
+    """
+    Forma canonica de un ISBN: sin guiones ni espacios y con la "X" final
+    del ISBN-10 en mayuscula, de modo que "978-0-06-088328-7" y
+    "9780060883287" se consideren el mismo ISBN.
+    """
+    return isbn.replace("-", "").replace(" ", "").upper()
@@ -0,0 +1,55 @@
+"""
+PLANIFICADOR DE RECORDATORIOS
+"""
+
+import heapq
+from typing import Any, Iterable, List, Tuple
+
+
+class PlanificadorRecordatorios:
+    """
+    Cola de prioridad de recordatorios ordenada por fecha de vencimiento.
+
+    Cada tick extrae solo los recordatorios vencidos, con costo
+    O(k log n) para k vencidos, sin recorrer los prestamos pendientes.
+    Los recordatorios de prestamos ya devueltos no se eliminan del monticulo:
+    se descartan al extraerlos, lo que mantiene la devolucion en O(1).
+    """
+    def __init__(self):
+        """
+        Inicializa el planificador sin recordatorios.
+        """
+        self._monticulo: List[Tuple[Any, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._monticulo)
+
+    def programar(self, fecha: Any, prestamo_id: int) -> None:
+        """
+        Programa el recordatorio de un prestamo para la fecha indicada.
+        """
+        heapq.heappush(self._monticulo, (fecha, prestamo_id))
+
+    def reconstruir(self, pendientes: Iterable[Tuple[Any, int]]) -> None:
+        """
+        Reemplaza todos los recordatorios por los pares (fecha, prestamo_id)
+        dados, en O(n).
+        """
+        self._monticulo = list(pendientes)
+        heapq.heapify(self._monticulo)
+
+    def extraer_vencidos(self, hasta: Any) -> List[int]:
+        """
+        Retira y retorna los IDs de prestamo con fecha menor o igual a hasta,
+        del vencimiento mas antiguo al mas reciente.
+        """
+        vencidos = []
+        while self._monticulo and self._monticulo[0][0] <= hasta:
+            vencidos.append(heapq.heappop(self._monticulo)[1])
+        return vencidos
+
+    def proximo_vencimiento(self):
+        """
+        Fecha del proximo recordatorio programado, o None si no hay.
+        """
+        return self._monticulo[0][0] if self._monticulo else None
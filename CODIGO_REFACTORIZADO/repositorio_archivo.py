@@ -4,9 +4,59 @@ REPOSITORIO ARCHIVO
 
 import json
 import os
-from typing import List, Dict, Any, Optional
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from irepositorio import IRepositorio
 
+_VERSION = re.compile(rb'\{\s*"version":\s*(\d+)')
+
+# Bytes de archivo cuyos datos parseados se retienen entre lecturas. Los
+# documentos mas grandes solo se comparten mientras alguien los usa.
+LIMITE_CACHE_BYTES = 2 * 1024 * 1024
+
+
+class _Documento(Mapping):
+    """
+    Documento leido del archivo, de solo lectura en todos sus niveles
+    (objetos como MappingProxyType y listas como tuplas), para que las
+    instancias que lo comparten no puedan alterarlo.
+    """
+    __slots__ = ("_datos", "__weakref__")
+
+    def __init__(self, datos: Mapping):
+        self._datos = datos
+
+    def __getitem__(self, clave: str) -> Any:
+        return self._datos[clave]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._datos)
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+def _congelar(objeto: Dict[str, Any]) -> Mapping:
+    """object_hook de json que deja cada objeto y sus listas inmutables."""
+    for clave, valor in objeto.items():
+        if type(valor) is list:
+            objeto[clave] = tuple(valor)
+    return MappingProxyType(objeto)
+
+
+# Por ruta absoluta: firma (mtime, tamano, inodo) del archivo y referencia
+# debil a sus datos. Compartido por todas las instancias.
+_cache_lecturas: Dict[str, Tuple[Tuple[int, int, int], "weakref.ref[_Documento]"]] = {}
+# Documentos retenidos aunque nadie los use, del mas antiguo al mas
+# reciente, con el tamano de su archivo; suman como maximo LIMITE_CACHE_BYTES.
+_retenidos: "OrderedDict[str, Tuple[_Documento, int]]" = OrderedDict()
+_candado_cache = threading.Lock()
+
 class RepositorioArchivo(IRepositorio):
     """
     Implementacion concreta del repositorio usando archivos JSON.
@@ -19,21 +69,16 @@ class RepositorioArchivo(IRepositorio):
         self._asegurar_archivo_existe()
 
     def guardar_datos(self, libros: List[Any], prestamos: List[Any], 
-                     contador_libro: int, contador_prestamo: int) -> bool:
+                     contador_libro: int, contador_prestamo: int,
+                     reservas: Optional[List[Dict[str, Any]]] = None) -> bool:
         """
-        Guarda todos los datos del sistema en archivo JSON.
+        Guarda todos los datos del sistema en archivo JSON. Si la escritura
+        falla a mitad, el archivo anterior queda intacto.
         """
         try:
-            datos = {
-                "libros": [self._libro_a_dict(libro) for libro in libros],
-                "prestamos": [self._prestamo_a_dict(prestamo) for prestamo in prestamos],
-                "contadores": {
-                    "libro": contador_libro,
-                    "prestamo": contador_prestamo
-                }
-            }
-
-            return self._escribir_archivo(datos)
+            self._reemplazar_archivo(lambda f: self._volcar_datos(
+                f, libros, prestamos, contador_libro, contador_prestamo, reservas=reservas))
+            return True
         except Exception as e:
             print(f"Error al guardar datos: {e}")
             return False
@@ -41,6 +86,11 @@ class RepositorioArchivo(IRepositorio):
     def cargar_datos(self) -> Optional[Dict[str, Any]]:
         """
         Carga todos los datos desde el archivo JSON.
+
+        Si el archivo no cambio desde la ultima lectura en este proceso
+        (mismo mtime, tamano e inodo) y sus datos siguen en memoria, se
+        retornan sin volver a parsear. Los datos son de solo lectura porque
+        se comparten entre instancias; para modificarlos hay que copiarlos.
         """
         try:
             return self._leer_archivo()
@@ -48,6 +98,23 @@ class RepositorioArchivo(IRepositorio):
             print(f"Error al cargar datos: {e}")
             return None
 
+    def iterar_libros(self, disponible: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los libros del archivo registro a registro, sin cargar el
+        documento completo.
+        """
+        for libro in self._iterar_seccion("libros"):
+            if disponible is None or libro.get("disponible") == disponible:
+                yield libro
+
+    def iterar_prestamos(self, devuelto: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los prestamos del archivo registro a registro.
+        """
+        for prestamo in self._iterar_seccion("prestamos"):
+            if devuelto is None or prestamo.get("devuelto") == devuelto:
+                yield prestamo
+
     def limpiar_datos(self) -> bool:
         """
         Limpia el archivo de datos manteniendo estructura basica.
@@ -67,6 +134,12 @@ class RepositorioArchivo(IRepositorio):
             print(f"Error al limpiar datos: {e}")
             return False
 
+    def ruta_indices(self) -> Optional[str]:
+        """
+        Los indices de busqueda se guardan junto al archivo de datos.
+        """
+        return self.archivo_path + ".indices"
+
     def existe_repositorio(self) -> bool:
         """
         Verifica si el archivo del repositorio existe.
@@ -135,16 +208,133 @@ class RepositorioArchivo(IRepositorio):
             "libro_id": prestamo.libro_id,
             "usuario": prestamo.usuario,
             "devuelto": prestamo.devuelto,
-            "fecha": prestamo.fecha
+            "fecha": prestamo.fecha,
+            "fecha_vencimiento": prestamo.fecha_vencimiento,
+            "recordatorio_enviado": prestamo.recordatorio_enviado,
+            "fecha_devolucion": prestamo.fecha_devolucion
         }
 
+    def _invalidar_cache(self) -> None:
+        """
+        Descarta la lectura en cache de este archivo antes de reescribirlo,
+        por si la escritura no alcanza a cambiar su mtime.
+        """
+        ruta = os.path.abspath(self.archivo_path)
+        with _candado_cache:
+            _cache_lecturas.pop(ruta, None)
+            _retenidos.pop(ruta, None)
+
+    def _volcar_datos(self, f, libros: List[Any], prestamos: List[Any],
+                      contador_libro: int, contador_prestamo: int,
+                      version: Optional[int] = None,
+                      reservas: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Escribe el documento JSON completo registro a registro. Si se indica
+        version, se escribe al inicio para poder leerla sin parsear el resto.
+        """
+        f.write('{\n')
+        if version is not None:
+            f.write(f'  "version": {version},\n')
+        f.write('  "libros": [')
+        self._escribir_registros(f, map(self._libro_a_dict, libros))
+        f.write('],\n  "prestamos": [')
+        self._escribir_registros(f, map(self._prestamo_a_dict, prestamos))
+        f.write('],\n  "reservas": [')
+        self._escribir_registros(f, iter(reservas or []))
+        f.write('],\n  "contadores": ')
+        json.dump({"libro": contador_libro, "prestamo": contador_prestamo}, f)
+        f.write('\n}\n')
+
+    @staticmethod
+    def _escribir_registros(f, registros: Iterator[Dict[str, Any]]) -> None:
+        """
+        Escribe un registro JSON por linea dentro de una lista, sin armar
+        la lista completa en memoria.
+        """
+        separador = "\n    "
+        for registro in registros:
+            f.write(separador)
+            f.write(json.dumps(registro, ensure_ascii=False))
+            separador = ",\n    "
+        if separador != "\n    ":
+            f.write("\n  ")
+
+    def _reemplazar_archivo(self, escribir: Callable[[Any], None]) -> None:
+        """
+        Escribe el archivo completo en un temporal y lo reemplaza de forma
+        atomica, de modo que un fallo a mitad de la escritura, o un lector
+        concurrente, nunca ve un archivo truncado.
+        """
+        self._invalidar_cache()
+        temporal = self.archivo_path + ".tmp"
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                escribir(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.archivo_path)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+    def _iterar_seccion(self, seccion: str) -> Iterator[Dict[str, Any]]:
+        """
+        Registros de una lista del documento leyendo linea a linea. Se apoya
+        en el formato de _volcar_datos (un registro por linea); si el archivo
+        tiene otro formato, como los escritos con json.dump, recurre a
+        cargar_datos.
+        """
+        encabezado = f'  "{seccion}": ['
+        try:
+            f = open(self.archivo_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+
+        with f:
+            for linea in f:
+                if linea.startswith(encabezado):
+                    break
+            else:
+                yield from (self.cargar_datos() or {}).get(seccion, [])
+                return
+
+            if linea[len(encabezado):].startswith("]"):
+                return
+
+            primero = True
+            for linea in f:
+                registro = linea.strip().rstrip(",")
+                if registro.startswith("]"):
+                    return
+                try:
+                    datos = json.loads(registro)
+                except json.JSONDecodeError:
+                    if not primero:
+                        raise
+                    yield from (self.cargar_datos() or {}).get(seccion, [])
+                    return
+                primero = False
+                yield datos
+
+    def _leer_version(self) -> int:
+        """
+        Lee la version de la cabecera del archivo sin parsearlo completo.
+        Los archivos sin version cuentan como version 0.
+        """
+        try:
+            with open(self.archivo_path, 'rb') as f:
+                coincidencia = _VERSION.match(f.read(64))
+            return int(coincidencia.group(1)) if coincidencia else 0
+        except FileNotFoundError:
+            return 0
+
     def _escribir_archivo(self, datos: Dict[str, Any]) -> bool:
         """
         Escribe datos en el archivo JSON.
         """
         try:
-            with open(self.archivo_path, 'w', encoding='utf-8') as f:
-                json.dump(datos, f, indent=2, ensure_ascii=False)
+            self._reemplazar_archivo(lambda f: json.dump(datos, f, indent=2, ensure_ascii=False))
             return True
         except Exception as e:
             print(f"Error al escribir archivo: {e}")
@@ -154,9 +344,30 @@ class RepositorioArchivo(IRepositorio):
         """
         Lee datos desde el archivo JSON.
         """
+        ruta = os.path.abspath(self.archivo_path)
         try:
-            with open(self.archivo_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            estado = os.stat(ruta)
+            firma = (estado.st_mtime_ns, estado.st_size, estado.st_ino)
+
+            with _candado_cache:
+                en_cache = _cache_lecturas.get(ruta)
+                datos = en_cache[1]() if en_cache and en_cache[0] == firma else None
+                if datos is not None:
+                    if ruta in _retenidos:
+                        _retenidos.move_to_end(ruta)
+                    return datos
+
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = _Documento(json.load(f, object_hook=_congelar))
+
+            with _candado_cache:
+                _cache_lecturas[ruta] = (firma, weakref.ref(datos))
+                _retenidos.pop(ruta, None)
+                if estado.st_size <= LIMITE_CACHE_BYTES:
+                    _retenidos[ruta] = (datos, estado.st_size)
+                    while sum(tamano for _, tamano in _retenidos.values()) > LIMITE_CACHE_BYTES:
+                        _retenidos.popitem(last=False)
+            return datos
         except FileNotFoundError:
             return None
         except json.JSONDecodeError as e:
@@ -0,0 +1,256 @@
+"""
+REPOSITORIO ARCHIVO COMPARTIDO
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional
+from repositorio_archivo import RepositorioArchivo
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Tamano a partir del cual el registro de cambios se reinicia
+LIMITE_REGISTRO_CAMBIOS = 4 * 1024 * 1024
+
+
+class RepositorioArchivoCompartido(RepositorioArchivo):
+    """
+    Repositorio en archivo JSON que pueden usar varios procesos a la vez.
+
+    Cada escritura incrementa un numero de version guardado al inicio del
+    archivo. Las operaciones se serializan con un bloqueo consultivo (flock)
+    sobre archivo_path + ".lock": dentro de transaccion(), SistemaBiblioteca
+    comprueba la version y, si otro proceso escribio, recarga el estado
+    antes de aplicar su cambio, de modo que nunca escribe sobre datos
+    ajenos que no conoce. Como ultima defensa, guardar_datos rechaza la
+    escritura si la version en disco no es la que esta instancia leyo.
+
+    Para no releer el archivo completo al sincronizar, cada escritura
+    agrega a archivo_path + ".cambios" una linea con su version y los
+    libros y prestamos que cambio, sabidos por los eventos que el sistema
+    registra antes de guardar. Otro proceso que quedo atras solo lee esas
+    lineas (leer_cambios_externos); si falta alguna version, o una
+    escritura no vino precedida de eventos, debe cargar todo.
+    """
+    def __init__(self, archivo_path: str = "biblioteca.json"):
+        """
+        Inicializa el repositorio y su archivo de bloqueo.
+        """
+        if fcntl is None:
+            raise RuntimeError("RepositorioArchivoCompartido requiere fcntl (sistemas POSIX)")
+
+        self._fd_bloqueo = os.open(archivo_path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._candado_hilos = threading.RLock()
+        self._profundidad = 0
+        self._version_conocida = 0
+        self.ruta_cambios = archivo_path + ".cambios"
+        self._posicion_cambios = (None, 0)
+        self._libros_cambiados = set()
+        self._prestamos_cambiados = set()
+        self._hubo_eventos = False
+
+        with self.transaccion():
+            super().__init__(archivo_path)
+            self._version_conocida = self._leer_version()
+
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        """
+        Toma el bloqueo exclusivo del archivo durante el bloque. Es
+        reentrante dentro del mismo proceso.
+        """
+        with self._candado_hilos:
+            if self._profundidad == 0:
+                fcntl.flock(self._fd_bloqueo, fcntl.LOCK_EX)
+            self._profundidad += 1
+            try:
+                yield
+            finally:
+                self._profundidad -= 1
+                if self._profundidad == 0:
+                    fcntl.flock(self._fd_bloqueo, fcntl.LOCK_UN)
+
+    def hay_cambios_externos(self) -> bool:
+        """
+        Compara la version en disco con la ultima leida o escrita.
+        """
+        return self._leer_version() != self._version_conocida
+
+    def registrar_evento(self, evento: Any) -> bool:
+        """
+        Anota que libros y prestamos cambia el evento, para incluirlos en
+        el registro de cambios de la proxima escritura.
+        """
+        self._libros_cambiados.update(evento.libros_afectados())
+        self._prestamos_cambiados.update(evento.prestamos_afectados())
+        self._hubo_eventos = True
+        return True
+
+    def leer_cambios_externos(self) -> Optional[Dict[str, Any]]:
+        """
+        Reune las lineas del registro de cambios posteriores a la version
+        conocida. Retorna None si el registro no cubre todas las versiones
+        hasta la del archivo.
+        """
+        with self.transaccion():
+            version_en_disco = self._leer_version()
+            libros: Dict[int, Dict[str, Any]] = {}
+            prestamos: Dict[int, Dict[str, Any]] = {}
+            quitados = set()
+            cambios: Dict[str, Any] = {}
+            version = self._version_conocida
+
+            for linea in self._lineas_nuevas_de_cambios():
+                if linea["version"] <= version:
+                    continue
+                if linea["version"] != version + 1 or linea.get("completo"):
+                    return None
+                version = linea["version"]
+                libros.update((libro["id"], libro) for libro in linea["libros"])
+                for prestamo in linea["prestamos"]:
+                    prestamos[prestamo["id"]] = prestamo
+                    quitados.discard(prestamo["id"])
+                for prestamo_id in linea["prestamos_quitados"]:
+                    prestamos.pop(prestamo_id, None)
+                    quitados.add(prestamo_id)
+                cambios["reservas"] = linea["reservas"]
+                cambios["contadores"] = linea["contadores"]
+
+            if version != version_en_disco:
+                return None
+
+            self._version_conocida = version
+            cambios["libros"] = sorted(libros.values(), key=lambda libro: libro["id"])
+            cambios["prestamos"] = sorted(prestamos.values(), key=lambda prestamo: prestamo["id"])
+            cambios["prestamos_quitados"] = sorted(quitados)
+            return cambios
+
+    def cargar_datos(self) -> Optional[Dict[str, Any]]:
+        """
+        Carga los datos bajo el bloqueo y recuerda su version.
+        """
+        with self.transaccion():
+            datos = super().cargar_datos()
+            self._version_conocida = datos.get("version", 0) if datos else 0
+            try:
+                estado = os.stat(self.ruta_cambios)
+                self._posicion_cambios = (estado.st_ino, estado.st_size)
+            except FileNotFoundError:
+                self._posicion_cambios = (None, 0)
+            return datos
+
+    def guardar_datos(self, libros: List[Any], prestamos: List[Any],
+                      contador_libro: int, contador_prestamo: int,
+                      reservas: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """
+        Escribe los datos con la siguiente version, solo si nadie mas
+        escribio desde la ultima lectura. El archivo se reemplaza de forma
+        atomica, por lo que un lector nunca ve una escritura a medias.
+        """
+        with self.transaccion():
+            version_en_disco = self._leer_version()
+            if version_en_disco != self._version_conocida:
+                print(f"Error al guardar datos: otro proceso modifico el archivo "
+                      f"(version {version_en_disco}, se esperaba {self._version_conocida})")
+                return False
+
+            try:
+                self._reemplazar_archivo(lambda f: self._volcar_datos(
+                    f, libros, prestamos, contador_libro, contador_prestamo,
+                    version_en_disco + 1, reservas))
+                self._version_conocida = version_en_disco + 1
+                self._anotar_cambios(libros, prestamos, contador_libro, contador_prestamo, reservas)
+                return True
+            except Exception as e:
+                print(f"Error al guardar datos: {e}")
+                return False
+            finally:
+                self._libros_cambiados = set()
+                self._prestamos_cambiados = set()
+                self._hubo_eventos = False
+
+    def limpiar_datos(self) -> bool:
+        """
+        Limpia los datos de todos los procesos, como una version nueva.
+        """
+        with self.transaccion():
+            self._version_conocida = self._leer_version()
+            return self.guardar_datos([], [], 1, 1)
+
+    def obtener_info(self) -> Dict[str, Any]:
+        """
+        Agrega la version conocida a la informacion del archivo.
+        """
+        info = super().obtener_info()
+        info["tipo"] = "archivo_compartido"
+        info["version"] = self._version_conocida
+        return info
+
+    def cerrar(self) -> None:
+        """
+        Libera el descriptor del archivo de bloqueo.
+        """
+        if self._fd_bloqueo is not None:
+            os.close(self._fd_bloqueo)
+            self._fd_bloqueo = None
+
+    def _anotar_cambios(self, libros: List[Any], prestamos: List[Any],
+                        contador_libro: int, contador_prestamo: int,
+                        reservas: Optional[List[Dict[str, Any]]]) -> None:
+        """
+        Agrega al registro de cambios la linea de la version recien escrita.
+        Los prestamos afectados que ya no estan en la lista se anotan como
+        quitados (por ejemplo, archivados al devolverlos).
+        """
+        linea: Dict[str, Any] = {"version": self._version_conocida}
+        if self._hubo_eventos:
+            linea["libros"] = [self._libro_a_dict(libro) for libro in libros
+                               if libro.id in self._libros_cambiados]
+            linea["prestamos"] = [self._prestamo_a_dict(prestamo) for prestamo in prestamos
+                                  if prestamo.id in self._prestamos_cambiados]
+            presentes = {prestamo["id"] for prestamo in linea["prestamos"]}
+            linea["prestamos_quitados"] = sorted(self._prestamos_cambiados - presentes)
+            linea["reservas"] = reservas or []
+            linea["contadores"] = {"libro": contador_libro, "prestamo": contador_prestamo}
+        else:
+            linea["completo"] = True
+
+        try:
+            if os.path.getsize(self.ruta_cambios) > LIMITE_REGISTRO_CAMBIOS:
+                # Un archivo nuevo (otro inodo) avisa a los lectores que
+                # deben empezar desde el principio.
+                temporal = self.ruta_cambios + ".tmp"
+                open(temporal, 'w').close()
+                os.replace(temporal, self.ruta_cambios)
+        except FileNotFoundError:
+            pass
+
+        with open(self.ruta_cambios, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(linea, ensure_ascii=False) + "\n")
+
+    def _lineas_nuevas_de_cambios(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lineas del registro de cambios que esta instancia todavia no leyo,
+        retomando desde la ultima posicion si el archivo es el mismo.
+        """
+        try:
+            f = open(self.ruta_cambios, 'rb')
+        except FileNotFoundError:
+            return
+
+        with f:
+            inodo = os.fstat(f.fileno()).st_ino
+            ultimo_inodo, posicion = self._posicion_cambios
+            if inodo == ultimo_inodo:
+                f.seek(posicion)
+
+            for linea in iter(f.readline, b""):
+                if not linea.endswith(b"\n"):
+                    break
+                self._posicion_cambios = (inodo, f.tell())
+                yield json.loads(linea)
@@ -0,0 +1,216 @@
+"""
+REPOSITORIO DE EVENTOS
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional
+from eventos import EstadoEventos, Evento, evento_desde_dict
+from irepositorio import IRepositorio
+from repositorio_archivo import RepositorioArchivo
+
+
+class RepositorioEventos(RepositorioArchivo):
+    """
+    Repositorio basado en eventos con instantaneas periodicas.
+
+    Cada cambio se agrega como evento tipado a un log de solo agregado,
+    dividido en segmentos eventos_<secuencia>.jsonl. Cada intervalo_instantanea
+    eventos se escribe una instantanea del estado completo (snapshot.json)
+    con la secuencia del ultimo evento incluido, y los eventos siguientes
+    van a un segmento nuevo. Al cargar se lee la instantanea y se aplican
+    solo los eventos posteriores, de modo que el arranque depende del
+    intervalo y no del tamano del historial. Los segmentos no se borran:
+    el log completo sirve como auditoria.
+    """
+    def __init__(self, directorio: str = "biblioteca_eventos", intervalo_instantanea: int = 1000):
+        """
+        Args:
+            directorio: Carpeta del log de eventos y la instantanea
+            intervalo_instantanea: Eventos entre una instantanea y la siguiente
+        """
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.intervalo_instantanea = intervalo_instantanea
+        super().__init__(os.path.join(directorio, "snapshot.json"))
+
+        self._secuencia_instantanea = self._leer_version()
+        self._secuencia = self._secuencia_instantanea
+        segmentos = self._segmentos()
+        if segmentos:
+            for evento in self._leer_segmento(segmentos[-1]):
+                self._secuencia = max(self._secuencia, evento["secuencia"])
+        self._segmento_activo: Optional[str] = None
+        self._hay_evento_sin_guardar = False
+
+    def registrar_evento(self, evento: Evento) -> bool:
+        """
+        Agrega un evento al final del log.
+        """
+        try:
+            if self._segmento_activo is None:
+                self._segmento_activo = self._ruta_segmento(self._secuencia + 1)
+
+            registro = {"secuencia": self._secuencia + 1,
+                        "registrado": datetime.now().isoformat(timespec="seconds"),
+                        **evento.a_dict()}
+            with open(self._segmento_activo, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+            self._secuencia += 1
+            self._hay_evento_sin_guardar = True
+            return True
+        except Exception as e:
+            print(f"Error al registrar evento: {e}")
+            return False
+
+    def guardar_datos(self, libros: List[Any], prestamos: List[Any],
+                      contador_libro: int, contador_prestamo: int,
+                      reservas: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """
+        Los cambios descritos por eventos ya quedaron en el log, asi que solo
+        se escribe una instantanea cuando se cumple el intervalo. Si el
+        estado cambio sin registrar eventos (por ejemplo, al archivar
+        prestamos al arrancar) se escribe una instantanea de inmediato para
+        no perder ese cambio.
+        """
+        describe_eventos = self._hay_evento_sin_guardar
+        self._hay_evento_sin_guardar = False
+
+        pendientes = self._secuencia - self._secuencia_instantanea
+        if describe_eventos and pendientes < self.intervalo_instantanea:
+            return True
+
+        return self._escribir_instantanea(libros, prestamos, contador_libro, contador_prestamo, reservas)
+
+    def cargar_datos(self) -> Optional[Dict[str, Any]]:
+        """
+        Carga la ultima instantanea y aplica los eventos posteriores.
+        """
+        try:
+            instantanea = self._leer_instantanea()
+            desde = instantanea.get("version", 0)
+            estado = EstadoEventos(instantanea)
+            for registro in self._eventos_desde(desde):
+                evento_desde_dict(registro).aplicar(estado)
+            return estado.a_dict()
+        except Exception as e:
+            print(f"Error al cargar datos: {e}")
+            return None
+
+    def iterar_libros(self, disponible: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        La instantanea no incluye los eventos posteriores, asi que se
+        recorre el estado reconstruido por cargar_datos.
+        """
+        return IRepositorio.iterar_libros(self, disponible)
+
+    def iterar_prestamos(self, devuelto: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Igual que iterar_libros, sobre el estado reconstruido.
+        """
+        return IRepositorio.iterar_prestamos(self, devuelto)
+
+    def limpiar_datos(self) -> bool:
+        """
+        Deja el estado vacio con una instantanea nueva; el log anterior se
+        conserva como historial.
+        """
+        return self._escribir_instantanea([], [], 1, 1, [])
+
+    def iterar_eventos(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre el log completo de eventos, del mas antiguo al mas reciente.
+        """
+        for ruta in self._segmentos():
+            yield from self._leer_segmento(ruta)
+
+    def obtener_info(self) -> Dict[str, Any]:
+        """
+        Obtiene informacion sobre el log y la ultima instantanea.
+        """
+        return {
+            "tipo": "eventos",
+            "directorio": self.directorio,
+            "secuencia": self._secuencia,
+            "secuencia_instantanea": self._secuencia_instantanea,
+            "segmentos": len(self._segmentos())
+        }
+
+    def _escribir_instantanea(self, libros: List[Any], prestamos: List[Any],
+                              contador_libro: int, contador_prestamo: int,
+                              reservas: Optional[List[Dict[str, Any]]]) -> bool:
+        """
+        Escribe el estado completo, etiquetado con la secuencia actual, y
+        cierra el segmento de eventos en curso.
+        """
+        try:
+            self._reemplazar_archivo(lambda f: self._volcar_datos(
+                f, libros, prestamos, contador_libro, contador_prestamo,
+                self._secuencia, reservas))
+
+            self._secuencia_instantanea = self._secuencia
+            self._segmento_activo = None
+            return True
+        except Exception as e:
+            print(f"Error al guardar instantanea: {e}")
+            return False
+
+    def _leer_instantanea(self) -> Dict[str, Any]:
+        """
+        Lee la instantanea sin pasar por la cache compartida, porque los
+        eventos se aplican sobre ella.
+        """
+        try:
+            with open(self.archivo_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _eventos_desde(self, secuencia: int) -> Iterator[Dict[str, Any]]:
+        """
+        Eventos con secuencia mayor a la indicada, leyendo solo los
+        segmentos que pueden contenerlos.
+        """
+        segmentos = self._segmentos()
+        inicios = [self._inicio_segmento(ruta) for ruta in segmentos]
+        primero = 0
+        for indice, inicio in enumerate(inicios):
+            if inicio <= secuencia + 1:
+                primero = indice
+
+        for ruta in segmentos[primero:]:
+            for registro in self._leer_segmento(ruta):
+                if registro["secuencia"] > secuencia:
+                    yield registro
+
+    def _segmentos(self) -> List[str]:
+        """Segmentos del log ordenados por su primera secuencia."""
+        return sorted(
+            os.path.join(self.directorio, nombre)
+            for nombre in os.listdir(self.directorio)
+            if nombre.startswith("eventos_") and nombre.endswith(".jsonl")
+        )
+
+    def _ruta_segmento(self, primera_secuencia: int) -> str:
+        """Ruta del segmento que empieza en la secuencia dada."""
+        return os.path.join(self.directorio, f"eventos_{primera_secuencia:012d}.jsonl")
+
+    @staticmethod
+    def _inicio_segmento(ruta: str) -> int:
+        """Primera secuencia de un segmento a partir de su nombre."""
+        return int(os.path.basename(ruta)[len("eventos_"):-len(".jsonl")])
+
+    @staticmethod
+    def _leer_segmento(ruta: str) -> Iterator[Dict[str, Any]]:
+        """Registros de un segmento; ignora una ultima linea incompleta."""
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError:
+                    if linea.endswith("\n"):
+                        raise
@@ -2,7 +2,7 @@
 REPOSITORIO MEMORIA
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 from irepositorio import IRepositorio
 
@@ -24,7 +24,8 @@ class RepositorioMemoria(IRepositorio):
         }
 
     def guardar_datos(self, libros: List[Any], prestamos: List[Any],
-                     contador_libro: int, contador_prestamo: int) -> bool:
+                     contador_libro: int, contador_prestamo: int,
+                     reservas: Optional[List[Dict[str, Any]]] = None) -> bool:
         """
         Guarda datos en la estructura de memoria.
         """
@@ -32,6 +33,7 @@ class RepositorioMemoria(IRepositorio):
             self.datos = {
                 "libros": [self._libro_a_dict(libro) for libro in libros],
                 "prestamos": [self._prestamo_a_dict(prestamo) for prestamo in prestamos],
+                "reservas": [dict(reserva, cola=list(reserva["cola"])) for reserva in reservas or []],
                 "contadores": {
                     "libro": contador_libro,
                     "prestamo": contador_prestamo
@@ -72,6 +74,22 @@ class RepositorioMemoria(IRepositorio):
             print(f"Error al limpiar memoria: {e}")
             return False
 
+    def iterar_libros(self, disponible: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los libros en memoria sin copiar el conjunto completo.
+        """
+        for libro in self.datos["libros"]:
+            if disponible is None or libro["disponible"] == disponible:
+                yield dict(libro)
+
+    def iterar_prestamos(self, devuelto: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los prestamos en memoria sin copiar el conjunto completo.
+        """
+        for prestamo in self.datos["prestamos"]:
+            if devuelto is None or prestamo["devuelto"] == devuelto:
+                yield dict(prestamo)
+
     def _libro_a_dict(self, libro: Any) -> Dict[str, Any]:
         """
         Convierte un objeto libro a diccionario.
@@ -93,5 +111,8 @@ class RepositorioMemoria(IRepositorio):
             "libro_id": prestamo.libro_id,
             "usuario": prestamo.usuario,
             "devuelto": prestamo.devuelto,
-            "fecha": prestamo.fecha
+            "fecha": prestamo.fecha,
+            "fecha_vencimiento": prestamo.fecha_vencimiento,
+            "recordatorio_enviado": prestamo.recordatorio_enviado,
+            "fecha_devolucion": prestamo.fecha_devolucion
         }
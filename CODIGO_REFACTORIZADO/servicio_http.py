@@ -0,0 +1,397 @@
+"""
+SERVICIO HTTP DE LA BIBLIOTECA
+"""
+
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from exportador import CAMPOS_LIBRO, CAMPOS_PRESTAMO, a_registro
+from vistas import VistaFiltrada
+
+_MENSAJES_ESTADO = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+    501: "Not Implemented"
+}
+_DEVOLUCION = re.compile(r"/prestamos/(\d+)/devolucion")
+
+Respuesta = Tuple[int, Any]
+
+
+class ErrorSolicitud(Exception):
+    """
+    Solicitud mal formada; se responde con el estado indicado.
+    """
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ServidorBiblioteca:
+    """
+    Servicio HTTP/1.1 con cuerpos JSON sobre un SistemaBiblioteca, hecho
+    solo con asyncio.
+
+    Cada conexion se mantiene abierta entre solicitudes (keep-alive) y
+    admite solicitudes encadenadas (pipelining): se leen en orden y las
+    respuestas se escriben en el mismo orden. Un semaforo limita cuantas
+    solicitudes se procesan a la vez en todas las conexiones; al llenarse,
+    las conexiones esperan antes de leer la siguiente solicitud. Las
+    llamadas al sistema, que no es seguro entre hilos y puede escribir a
+    disco, se ejecutan de una en una en un hilo aparte para no bloquear el
+    bucle de eventos.
+
+    Mientras sirve, cada intervalo_mantenimiento segundos envia los
+    recordatorios de devolucion vencidos y guarda los indices de busqueda
+    pendientes, en ese mismo hilo.
+
+    Rutas:
+        GET  /libros?disponible=true|false&desde=0&limite=100
+        POST /libros                      {"titulo", "autor", "isbn"}
+        GET  /libros/buscar?criterio=autor&valor=garcia
+        GET  /autocompletar?criterio=titulo&prefijo=cie&limite=10
+        GET  /prestamos?desde=0&limite=100 (prestamos activos)
+        POST /prestamos                   {"libro_id", "usuario"}
+        POST /prestamos/<id>/devolucion
+    """
+    def __init__(self,
+                 sistema: Any,
+                 host: str = "127.0.0.1",
+                 puerto: int = 8080,
+                 max_concurrentes: int = 64,
+                 max_cuerpo: int = 1024 * 1024,
+                 intervalo_mantenimiento: Optional[float] = 60.0):
+        """
+        Args:
+            sistema: SistemaBiblioteca a exponer
+            host: Direccion donde escuchar
+            puerto: Puerto donde escuchar (0 elige uno libre)
+            max_concurrentes: Solicitudes procesadas a la vez como maximo
+            max_cuerpo: Tamano maximo del cuerpo de una solicitud en bytes
+            intervalo_mantenimiento: Segundos entre rondas de recordatorios;
+                None las desactiva
+        """
+        self.sistema = sistema
+        self.host = host
+        self.puerto = puerto
+        self.max_concurrentes = max_concurrentes
+        self.max_cuerpo = max_cuerpo
+        self.intervalo_mantenimiento = intervalo_mantenimiento
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="biblioteca")
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._mantenimiento: Optional[asyncio.Task] = None
+
+        self._rutas: Dict[Tuple[str, str], Callable[[Dict[str, str], Any], Respuesta]] = {
+            ("GET", "/libros"): self._listar_libros,
+            ("POST", "/libros"): self._agregar_libro,
+            ("GET", "/libros/buscar"): self._buscar_libros,
+            ("GET", "/autocompletar"): self._autocompletar,
+            ("GET", "/prestamos"): self._listar_prestamos,
+            ("POST", "/prestamos"): self._realizar_prestamo,
+        }
+
+    async def iniciar(self) -> None:
+        """
+        Empieza a aceptar conexiones. Si el puerto era 0, self.puerto queda
+        con el puerto asignado.
+        """
+        self._semaforo = asyncio.Semaphore(self.max_concurrentes)
+        self._servidor = await asyncio.start_server(self._atender_conexion, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        if self.intervalo_mantenimiento:
+            self._mantenimiento = asyncio.create_task(self._mantener_periodicamente())
+
+    async def servir(self) -> None:
+        """
+        Inicia el servidor y atiende hasta que se cancele.
+        """
+        await self.iniciar()
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def detener(self) -> None:
+        """
+        Deja de aceptar conexiones y libera el hilo del sistema.
+        """
+        if self._mantenimiento:
+            self._mantenimiento.cancel()
+            self._mantenimiento = None
+        if self._servidor:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        self._ejecutor.shutdown(wait=True)
+
+    async def _mantener_periodicamente(self) -> None:
+        """
+        Ejecuta mantener() cada intervalo_mantenimiento segundos.
+        """
+        bucle = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.intervalo_mantenimiento)
+            await bucle.run_in_executor(self._ejecutor, self.mantener)
+
+    def mantener(self) -> None:
+        """
+        Envia los recordatorios vencidos y guarda los indices pendientes.
+        """
+        try:
+            self.sistema.procesar_recordatorios()
+            self.sistema.guardar_indices()
+        except Exception as e:
+            print(f"Error en mantenimiento del servicio: {e}")
+
+    async def _atender_conexion(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """
+        Atiende las solicitudes de una conexion, en orden, hasta que el
+        cliente la cierre o pida cerrarla.
+        """
+        try:
+            while True:
+                try:
+                    solicitud = await self._leer_solicitud(lector)
+                except ErrorSolicitud as e:
+                    self._escribir_respuesta(escritor, e.estado, {"error": str(e)}, False)
+                    await escritor.drain()
+                    break
+                if solicitud is None:
+                    break
+
+                metodo, ruta, cuerpo, mantener_abierta = solicitud
+                async with self._semaforo:
+                    estado, contenido = await self._despachar(metodo, ruta, cuerpo)
+
+                self._escribir_respuesta(escritor, estado, contenido, mantener_abierta)
+                await escritor.drain()
+                if not mantener_abierta:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _leer_solicitud(self, lector: asyncio.StreamReader) -> Optional[Tuple[str, str, bytes, bool]]:
+        """
+        Lee una solicitud completa. Retorna None si el cliente cerro la
+        conexion entre solicitudes.
+        """
+        try:
+            cabecera = await lector.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise ErrorSolicitud(400, "Solicitud incompleta")
+        except asyncio.LimitOverrunError:
+            raise ErrorSolicitud(400, "Cabeceras demasiado grandes")
+
+        lineas = cabecera.decode("latin-1").split("\r\n")
+        partes = lineas[0].split(" ")
+        if len(partes) != 3 or not partes[2].startswith("HTTP/"):
+            raise ErrorSolicitud(400, "Linea de solicitud invalida")
+        metodo, ruta, version = partes
+
+        cabeceras = {}
+        for linea in lineas[1:]:
+            if ":" in linea:
+                nombre, valor = linea.split(":", 1)
+                cabeceras[nombre.strip().lower()] = valor.strip()
+
+        if "transfer-encoding" in cabeceras:
+            # Sin leer el cuerpo por fragmentos no se sabe donde termina, y
+            # seguir leyendo lo confundiria con la siguiente solicitud.
+            raise ErrorSolicitud(501, "Transfer-Encoding no soportado; use Content-Length")
+        try:
+            longitud = int(cabeceras.get("content-length", "0"))
+        except ValueError:
+            raise ErrorSolicitud(400, "Content-Length invalido")
+        if longitud < 0:
+            raise ErrorSolicitud(400, "Content-Length invalido")
+        if longitud > self.max_cuerpo:
+            raise ErrorSolicitud(413, "Cuerpo demasiado grande")
+        cuerpo = await lector.readexactly(longitud) if longitud else b""
+
+        conexion = cabeceras.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            mantener_abierta = conexion == "keep-alive"
+        else:
+            mantener_abierta = conexion != "close"
+
+        return metodo, ruta, cuerpo, mantener_abierta
+
+    async def _despachar(self, metodo: str, ruta: str, cuerpo: bytes) -> Respuesta:
+        """
+        Ejecuta la ruta correspondiente en el hilo del sistema.
+        """
+        url = urlsplit(ruta)
+        parametros = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+
+        manejador = self._rutas.get((metodo, url.path))
+        if manejador is None:
+            devolucion = _DEVOLUCION.fullmatch(url.path)
+            if devolucion and metodo == "POST":
+                parametros["prestamo_id"] = devolucion.group(1)
+                manejador = self._devolver_libro
+            elif devolucion or any(path == url.path for _, path in self._rutas):
+                return 405, {"error": f"Metodo {metodo} no permitido en {url.path}"}
+            else:
+                return 404, {"error": f"Ruta {url.path} no encontrada"}
+
+        try:
+            datos = json.loads(cuerpo) if cuerpo else {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return 400, {"error": "El cuerpo no es JSON valido"}
+
+        bucle = asyncio.get_running_loop()
+        try:
+            return await bucle.run_in_executor(self._ejecutor, manejador, parametros, datos)
+        except ErrorSolicitud as e:
+            return e.estado, {"error": str(e)}
+        except Exception as e:
+            print(f"Error al atender {metodo} {url.path}: {e}")
+            return 500, {"error": "Error interno"}
+
+    def _escribir_respuesta(self, escritor: asyncio.StreamWriter, estado: int,
+                            contenido: Any, mantener_abierta: bool) -> None:
+        """
+        Serializa la respuesta JSON en el buffer de la conexion.
+        """
+        cuerpo = json.dumps(contenido, ensure_ascii=False).encode("utf-8")
+        cabecera = (
+            f"HTTP/1.1 {estado} {_MENSAJES_ESTADO.get(estado, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if mantener_abierta else 'close'}\r\n\r\n"
+        )
+        escritor.write(cabecera.encode("latin-1") + cuerpo)
+
+    @staticmethod
+    def _resultado(mensaje: str, estado_exito: int = 200) -> Respuesta:
+        """
+        Traduce los mensajes del sistema ("Error: ..." o de exito) a una
+        respuesta HTTP.
+        """
+        if mensaje.startswith("Error"):
+            return 404 if "no encontrado" in mensaje else 400, {"error": mensaje}
+        return estado_exito, {"mensaje": mensaje}
+
+    @staticmethod
+    def _entero(parametros: Dict[str, Any], nombre: str, por_defecto: Optional[int] = None) -> int:
+        """
+        Lee un parametro entero obligatorio u opcional.
+        """
+        valor = parametros.get(nombre, por_defecto)
+        if valor is None:
+            raise ErrorSolicitud(400, f"Falta el parametro '{nombre}'")
+        try:
+            return int(valor)
+        except (TypeError, ValueError):
+            raise ErrorSolicitud(400, f"El parametro '{nombre}' debe ser un numero entero")
+
+    def _pagina(self, vista: Any, parametros: Dict[str, str], campos: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """
+        Recorta una vista de solo lectura segun desde/limite sin copiar el resto.
+        """
+        desde = max(0, self._entero(parametros, "desde", 0))
+        limite = max(0, min(1000, self._entero(parametros, "limite", 100)))
+        return [a_registro(elemento, campos) for elemento in vista[desde:desde + limite]]
+
+    def _listar_libros(self, parametros: Dict[str, str], datos: Any) -> Respuesta:
+        """GET /libros: pagina del catalogo, opcionalmente por disponibilidad."""
+        disponible = parametros.get("disponible")
+        if disponible == "true":
+            vista = self.sistema.obtener_libros_disponibles()
+        elif disponible == "false":
+            vista = VistaFiltrada(self.sistema.obtener_todos_libros(), lambda libro: not libro.disponible)
+        else:
+            vista = self.sistema.obtener_todos_libros()
+        return 200, self._pagina(vista, parametros, CAMPOS_LIBRO)
+
+    def _agregar_libro(self, parametros: Dict[str, str], datos: Any) -> Respuesta:
+        """POST /libros: agrega un libro."""
+        if not isinstance(datos, dict):
+            raise ErrorSolicitud(400, "Se esperaba un objeto JSON")
+        mensaje = self.sistema.agregar_libro(datos.get("titulo"), datos.get("autor"), datos.get("isbn"))
+        return self._resultado(mensaje, 201)
+
+    def _buscar_libros(self, parametros: Dict[str, str], datos: Any) -> Respuesta:
+        """GET /libros/buscar: busqueda por cualquier criterio registrado."""
+        criterio = parametros.get("criterio")
+        valor = parametros.get("valor")
+        es_valido, mensaje = self.sistema.validador.validar_criterio_busqueda(criterio, valor)
+        if not es_valido:
+            return 400, {"error": mensaje}
+        if criterio not in self.sistema.busqueda.obtener_criterios_disponibles():
+            return 400, {"error": f"Error: Criterio '{criterio}' no soportado"}
+        return 200, [a_registro(libro, CAMPOS_LIBRO) for libro in self.sistema.buscar_libro(criterio, valor)]
+
+    def _autocompletar(self, parametros: Dict[str, str], datos: Any) -> Respuesta:
+        """GET /autocompletar: sugerencias para un prefijo."""
+        criterio = parametros.get("criterio", "titulo")
+        if criterio not in self.sistema.busqueda.obtener_criterios_autocompletado():
+            return 400, {"error": f"Error: Criterio '{criterio}' no soportado"}
+        limite = max(1, min(100, self._entero(parametros, "limite", 10)))
+        return 200, self.sistema.autocompletar(criterio, parametros.get("prefijo", ""), limite)
+
+    def _listar_prestamos(self, parametros: Dict[str, str], datos: Any) -> Respuesta:
+        """GET /prestamos: pagina de prestamos activos."""
+        return 200, self._pagina(self.sistema.obtener_prestamos_activos(), parametros, CAMPOS_PRESTAMO)
+
+    def _realizar_prestamo(self, parametros: Dict[str, str], datos: Any) -> Respuesta:
+        """POST /prestamos: presta un libro a un usuario."""
+        if not isinstance(datos, dict):
+            raise ErrorSolicitud(400, "Se esperaba un objeto JSON")
+        libro_id = datos.get("libro_id")
+        if isinstance(libro_id, bool):
+            # En Python bool es subclase de int: true llegaria como el libro 1
+            raise ErrorSolicitud(400, "El campo 'libro_id' debe ser un numero entero")
+        return self._resultado(self.sistema.realizar_prestamo(libro_id, datos.get("usuario")), 201)
+
+    def _devolver_libro(self, parametros: Dict[str, str], datos: Any) -> Respuesta:
+        """POST /prestamos/<id>/devolucion: registra la devolucion."""
+        return self._resultado(self.sistema.devolver_libro(self._entero(parametros, "prestamo_id")))
+
+
+def main():
+    """
+    Levanta el servicio sobre un repositorio en memoria o en archivo.
+    """
+    import argparse
+    from biblioteca import SistemaBiblioteca
+    from busqueda import Busqueda
+    from validador_biblioteca import ValidadorBiblioteca
+    from servicio_notificaciones import ServicioNotificaciones
+    from repositorio_archivo import RepositorioArchivo
+    from repositorio_memoria import RepositorioMemoria
+
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de la biblioteca.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--concurrencia", type=int, default=64, help="Solicitudes simultaneas como maximo")
+    parser.add_argument("--archivo", help="Usar RepositorioArchivo con esta ruta en lugar de memoria")
+    parser.add_argument("--intervalo-mantenimiento", type=float, default=60.0,
+                        help="Segundos entre rondas de recordatorios; 0 las desactiva")
+    opciones = parser.parse_args()
+
+    sistema = SistemaBiblioteca(
+        busqueda=Busqueda(),
+        validador=ValidadorBiblioteca(),
+        repositorio=RepositorioArchivo(opciones.archivo) if opciones.archivo else RepositorioMemoria(),
+        notificaciones=ServicioNotificaciones()
+    )
+    servidor = ServidorBiblioteca(sistema, opciones.host, opciones.puerto, opciones.concurrencia,
+                                  intervalo_mantenimiento=opciones.intervalo_mantenimiento or None)
+
+    print(f"Escuchando en http://{opciones.host}:{opciones.puerto}")
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sistema.cerrar()
+
+
+if __name__ == "__main__":
+    main()
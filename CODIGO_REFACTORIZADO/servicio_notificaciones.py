@@ -2,8 +2,16 @@
 SERVICIO NOTIFICACIONES
 """
 
+import gzip
+import lzma
+import os
+import queue
+import shutil
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturoTimeoutError
+from typing import List, Dict, Any, FrozenSet, Iterable, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -14,6 +22,7 @@ class TipoNotificacion(Enum):
     LIBRO_AGREGADO = "libro_agregado"
     RECORDATORIO_DEVOLUCION = "recordatorio_devolucion"
     LIBRO_DISPONIBLE = "libro_disponible"
+    RESERVA_DISPONIBLE = "reserva_disponible"
     ERROR_SISTEMA = "error_sistema"
 
 
@@ -21,7 +30,23 @@ class CanalNotificacion(ABC):
     """
     Interfaz abstracta para diferentes canales de notificacion.
     Permite implementar diferentes tipos de notificaciones (consola, email, SMS, etc.)
+
+    Cada canal puede suscribirse a un subconjunto de tipos de notificacion;
+    sin suscripcion explicita recibe todos.
     """
+    tipos_suscritos: Optional[FrozenSet[TipoNotificacion]] = None
+
+    def suscribir(self, tipos: Optional[Iterable[TipoNotificacion]]) -> None:
+        """
+        Limita el canal a los tipos indicados (None para recibir todos).
+        """
+        self.tipos_suscritos = frozenset(tipos) if tipos is not None else None
+
+    def acepta(self, tipo: TipoNotificacion) -> bool:
+        """
+        Indica si el canal esta suscrito al tipo de notificacion.
+        """
+        return self.tipos_suscritos is None or tipo in self.tipos_suscritos
 
     @abstractmethod
     def enviar(self, mensaje: str, tipo: TipoNotificacion, datos: Dict[str, Any] = None) -> bool:
@@ -43,6 +68,14 @@ class NotificacionConsola(CanalNotificacion):
     Implementacion de notificaciones por consola.
     Muestra mensajes formateados en la consola del sistema.
     """
+    def __init__(self, tipos: Optional[Iterable[TipoNotificacion]] = None):
+        """
+        Inicializa el canal de notificaciones por consola.
+
+        Args:
+            tipos: Tipos de notificacion a los que se suscribe (None para todos)
+        """
+        self.suscribir(tipos)
 
     def enviar(self, mensaje: str, tipo: TipoNotificacion, datos: Dict[str, Any] = None) -> bool:
         """
@@ -54,13 +87,8 @@ class NotificacionConsola(CanalNotificacion):
             mensaje_formateado = f"[{timestamp}] {mensaje}"
 
             if datos:
-                detalles = []
-
-                for clave, valor in datos.items():
-                    detalles.append(f"{clave}: {valor}")
-
-                if detalles:
-                    mensaje_formateado += f" | {' | '.join(detalles)}"
+                detalles = " | ".join(f"{clave}: {valor}" for clave, valor in datos.items())
+                mensaje_formateado += f" | {detalles}"
 
             print(mensaje_formateado)
             return True
@@ -72,12 +100,45 @@ class NotificacionConsola(CanalNotificacion):
 class NotificacionArchivo(CanalNotificacion):
     """
     Implementacion de notificaciones por archivo de log.
+
+    El log rota al superar max_bytes o al cumplirse intervalo_rotacion
+    segundos. Rotar solo renombra el archivo; la compresion del segmento
+    rotado y la limpieza de segmentos viejos se hacen en un hilo aparte,
+    de modo que escribir una notificacion nunca espera por ellas.
     """
-    def __init__(self, archivo_log: str = "notificaciones.log"):
+    _EXTENSIONES = {"gzip": ".gz", "lzma": ".xz"}
+
+    def __init__(self, archivo_log: str = "notificaciones.log",
+                 max_bytes: Optional[int] = 10 * 1024 * 1024,
+                 intervalo_rotacion: Optional[float] = None,
+                 compresion: Optional[str] = "gzip",
+                 max_segmentos: Optional[int] = 10,
+                 tipos: Optional[Iterable[TipoNotificacion]] = None):
         """
         Inicializa el canal de notificaciones por archivo.
+
+        Args:
+            archivo_log: Ruta del log activo
+            max_bytes: Tamano que dispara la rotacion (None para no rotar por tamano)
+            intervalo_rotacion: Segundos que dispara la rotacion (None para no rotar por tiempo)
+            compresion: "gzip", "lzma" o None para dejar los segmentos sin comprimir
+            max_segmentos: Segmentos rotados que se conservan (None para conservar todos)
+            tipos: Tipos de notificacion a los que se suscribe (None para todos)
         """
+        if compresion is not None and compresion not in self._EXTENSIONES:
+            raise ValueError(f"Compresion '{compresion}' no soportada. "
+                             f"Opciones: {list(self._EXTENSIONES.keys())}")
+
+        self.suscribir(tipos)
         self.archivo_log = archivo_log
+        self.max_bytes = max_bytes
+        self.intervalo_rotacion = intervalo_rotacion
+        self.compresion = compresion
+        self.max_segmentos = max_segmentos
+        self._candado = threading.Lock()
+        self._compresor: Optional[ThreadPoolExecutor] = None
+        self._tamano = os.path.getsize(archivo_log) if os.path.exists(archivo_log) else 0
+        self._inicio_segmento = time.time()
 
     def enviar(self, mensaje: str, tipo: TipoNotificacion, datos: Dict[str, Any] = None) -> bool:
         """
@@ -91,9 +152,15 @@ class NotificacionArchivo(CanalNotificacion):
                 linea_log += f" | Datos: {datos}"
 
             linea_log += "\n"
+            contenido = linea_log.encode('utf-8')
 
-            with open(self.archivo_log, 'a', encoding='utf-8') as f:
-                f.write(linea_log)
+            with self._candado:
+                if self._debe_rotar(len(contenido)):
+                    self._rotar()
+
+                with open(self.archivo_log, 'ab') as f:
+                    f.write(contenido)
+                self._tamano += len(contenido)
 
             return True
 
@@ -101,26 +168,242 @@ class NotificacionArchivo(CanalNotificacion):
             print(f"Error al escribir notificacion en archivo: {e}")
             return False
 
+    def cerrar(self) -> None:
+        """
+        Espera a que terminen las compresiones pendientes.
+        """
+        if self._compresor is not None:
+            self._compresor.shutdown(wait=True)
+            self._compresor = None
+
+    def _debe_rotar(self, bytes_nuevos: int) -> bool:
+        """
+        Indica si el log activo debe rotarse antes de escribir.
+        """
+        if self._tamano == 0:
+            return False
+        if self.max_bytes is not None and self._tamano + bytes_nuevos > self.max_bytes:
+            return True
+        return (self.intervalo_rotacion is not None
+                and time.time() - self._inicio_segmento >= self.intervalo_rotacion)
+
+    def _rotar(self) -> None:
+        """
+        Renombra el log activo y delega su compresion al hilo de fondo.
+        """
+        rotado = f"{self.archivo_log}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        os.replace(self.archivo_log, rotado)
+        self._tamano = 0
+        self._inicio_segmento = time.time()
+
+        if self._compresor is None:
+            self._compresor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rotacion_log")
+        self._compresor.submit(self._comprimir_y_depurar, rotado)
+
+    def _comprimir_y_depurar(self, rotado: str) -> None:
+        """
+        Comprime un segmento rotado y aplica el limite de retencion.
+        """
+        try:
+            if self.compresion:
+                destino = rotado + self._EXTENSIONES[self.compresion]
+                abrir = gzip.open if self.compresion == "gzip" else lzma.open
+                with open(rotado, 'rb') as origen, abrir(destino + ".tmp", 'wb') as comprimido:
+                    shutil.copyfileobj(origen, comprimido)
+                os.replace(destino + ".tmp", destino)
+                os.remove(rotado)
+
+            if self.max_segmentos is not None:
+                for viejo in self._segmentos_rotados()[:-self.max_segmentos or None]:
+                    os.remove(viejo)
+        except Exception as e:
+            print(f"Error al comprimir log rotado: {e}")
+
+    def _segmentos_rotados(self) -> List[str]:
+        """
+        Segmentos rotados ya terminados, del mas antiguo al mas reciente.
+        Con compresion solo cuentan los comprimidos: los segmentos sin
+        comprimir todavia tienen su compresion en cola y no se deben borrar.
+        """
+        directorio = os.path.dirname(os.path.abspath(self.archivo_log))
+        prefijo = os.path.basename(self.archivo_log) + "."
+        sufijo = self._EXTENSIONES[self.compresion] if self.compresion else ""
+        return sorted(
+            os.path.join(directorio, nombre)
+            for nombre in os.listdir(directorio)
+            if nombre.startswith(prefijo) and nombre.endswith(sufijo) and not nombre.endswith(".tmp")
+        )
+
+class EstadoCanal:
+    """
+    Configuracion, circuito y estadisticas de un canal dentro del servicio.
+
+    El circuito se abre tras umbral_fallos fallos consecutivos (errores,
+    envios fallidos o timeouts); mientras esta abierto el canal se omite.
+    Pasado el enfriamiento se deja pasar un unico intento de prueba: si
+    tiene exito el circuito se cierra y si falla vuelve a abrirse.
+    """
+    def __init__(self, timeout: float, umbral_fallos: int, enfriamiento: float):
+        self.timeout = timeout
+        self.umbral_fallos = umbral_fallos
+        self.enfriamiento = enfriamiento
+        self.fallos_consecutivos = 0
+        self.abierto_hasta = 0.0
+        self.probando = False
+        self.exitos = 0
+        self.fallos = 0
+        self.timeouts = 0
+        self.omitidos = 0
+        self.latencia_total = 0.0
+        self.latencia_maxima = 0.0
+
+    def circuito_abierto(self, ahora: float) -> bool:
+        """Indica si el circuito esta abierto, sin modificarlo."""
+        if self.fallos_consecutivos < self.umbral_fallos:
+            return False
+        return ahora < self.abierto_hasta or self.probando
+
+    def permite_envio(self, ahora: float) -> bool:
+        """
+        Indica si el circuito deja pasar un envio en este momento. Con el
+        circuito medio abierto solo el primer llamador obtiene True, y los
+        demas se omiten hasta que ese intento registre su resultado.
+        """
+        if self.circuito_abierto(ahora):
+            return False
+        if self.fallos_consecutivos >= self.umbral_fallos:
+            self.probando = True
+        return True
+
+    def registrar(self, exito: bool, latencia: float, timeout: bool = False) -> None:
+        """Actualiza estadisticas y circuito con el resultado de un envio."""
+        self.probando = False
+        self.latencia_total += latencia
+        self.latencia_maxima = max(self.latencia_maxima, latencia)
+        if exito:
+            self.exitos += 1
+            self.fallos_consecutivos = 0
+            return
+
+        if timeout:
+            self.timeouts += 1
+        else:
+            self.fallos += 1
+        self.fallos_consecutivos += 1
+        if self.fallos_consecutivos >= self.umbral_fallos:
+            self.abierto_hasta = time.monotonic() + self.enfriamiento
+
+    def a_dict(self) -> Dict[str, Any]:
+        """Resumen de las estadisticas del canal."""
+        intentos = self.exitos + self.fallos + self.timeouts
+        return {
+            "exitos": self.exitos,
+            "fallos": self.fallos,
+            "timeouts": self.timeouts,
+            "omitidos": self.omitidos,
+            "latencia_media_ms": (self.latencia_total / intentos * 1000) if intentos else 0.0,
+            "latencia_maxima_ms": self.latencia_maxima * 1000,
+            "circuito_abierto": self.circuito_abierto(time.monotonic())
+        }
+
+class _Envio:
+    """
+    Envio encolado en un canal: su futuro (exito, latencia) y el momento
+    en que el canal lo comenzo.
+    """
+    def __init__(self):
+        self.futuro: Future = Future()
+        self.iniciado = threading.Event()
+        self.inicio: Optional[float] = None
+
+
+class _TrabajadorCanal:
+    """
+    Hilo daemon dedicado a un canal, con su cola de envios.
+
+    Un canal colgado solo retiene su propio hilo: los demas canales siguen
+    atendiendo y, al ser daemon, el hilo no impide que el interprete termine.
+    """
+    def __init__(self, canal: CanalNotificacion):
+        self.canal = canal
+        self._cola: "queue.Queue" = queue.Queue()
+        self._hilo = threading.Thread(target=self._atender, daemon=True,
+                                      name=f"notificaciones-{type(canal).__name__}")
+        self._hilo.start()
+
+    def enviar(self, mensaje: str, tipo: TipoNotificacion, datos: Dict[str, Any]) -> _Envio:
+        """
+        Encola un envio para el hilo del canal.
+        """
+        envio = _Envio()
+        self._cola.put((envio, mensaje, tipo, datos))
+        return envio
+
+    def detener(self) -> None:
+        """Pide al hilo que termine al vaciar la cola."""
+        self._cola.put(None)
+
+    def _atender(self) -> None:
+        while True:
+            trabajo = self._cola.get()
+            if trabajo is None:
+                return
+            envio, mensaje, tipo, datos = trabajo
+            if not envio.futuro.set_running_or_notify_cancel():
+                continue
+            envio.inicio = time.monotonic()
+            envio.iniciado.set()
+            try:
+                exito = bool(self.canal.enviar(mensaje, tipo, datos))
+            except Exception as e:
+                print(f"Error en canal de notificacion: {e}")
+                exito = False
+            envio.futuro.set_result((exito, time.monotonic() - envio.inicio))
+
+
 class ServicioNotificaciones:
     """
     Clase responsable de gestionar notificaciones del sistema.
+
+    Cada canal tiene su propio hilo y su propio timeout, que empieza a
+    correr cuando el canal comienza el envio. La latencia de una
+    notificacion es la del canal mas lento (acotada por su timeout) y no la
+    suma de todos, y un canal colgado no demora a los demas.
     """
-    def __init__(self):
+    def __init__(self, timeout_por_defecto: float = 2.0,
+                 umbral_fallos: int = 3, enfriamiento: float = 30.0):
         """
         Inicializa el servicio con canales de notificacion por defecto.
+
+        Args:
+            timeout_por_defecto: Segundos que se espera a cada canal
+            umbral_fallos: Fallos consecutivos que abren el circuito de un canal
+            enfriamiento: Segundos que un circuito abierto omite al canal
         """
         self.canales: List[CanalNotificacion] = [
             NotificacionConsola(),
             NotificacionArchivo()
         ]
         self.activo = True
-
-    def agregar_canal(self, canal: CanalNotificacion) -> None:
+        self.timeout_por_defecto = timeout_por_defecto
+        self.umbral_fallos = umbral_fallos
+        self.enfriamiento = enfriamiento
+        self._estados: Dict[int, EstadoCanal] = {}
+        self._candado = threading.Lock()
+        self._trabajadores: Dict[int, _TrabajadorCanal] = {}
+
+    def agregar_canal(self, canal: CanalNotificacion, timeout: Optional[float] = None) -> None:
         """
         Agrega un nuevo canal de notificacion al servicio.
+
+        Args:
+            canal: Canal a agregar
+            timeout: Segundos que se espera a este canal; por defecto timeout_por_defecto
         """
         if canal not in self.canales:
             self.canales.append(canal)
+        if timeout is not None:
+            self._estado(canal).timeout = timeout
 
     def remover_canal(self, tipo_canal: type) -> bool:
         """
@@ -129,9 +412,44 @@ class ServicioNotificaciones:
         for i, canal in enumerate(self.canales):
             if isinstance(canal, tipo_canal):
                 del self.canales[i]
+                with self._candado:
+                    self._estados.pop(id(canal), None)
+                    trabajador = self._trabajadores.pop(id(canal), None)
+                if trabajador is not None:
+                    trabajador.detener()
                 return True
         return False
 
+    def configurar_timeout(self, canal: CanalNotificacion, timeout: float) -> None:
+        """
+        Cambia el timeout de un canal ya agregado.
+        """
+        self._estado(canal).timeout = timeout
+
+    def obtener_estadisticas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna por canal los envios exitosos, fallidos, con timeout y
+        omitidos por circuito abierto, junto con su latencia.
+        """
+        estadisticas = {}
+        with self._candado:
+            for canal in self.canales:
+                nombre = type(canal).__name__
+                if nombre in estadisticas:
+                    nombre = f"{nombre}#{len(estadisticas)}"
+                estadisticas[nombre] = self._estado_sin_candado(canal).a_dict()
+        return estadisticas
+
+    def cerrar(self) -> None:
+        """
+        Detiene los hilos de los canales sin esperar a canales bloqueados.
+        """
+        with self._candado:
+            trabajadores = list(self._trabajadores.values())
+            self._trabajadores.clear()
+        for trabajador in trabajadores:
+            trabajador.detener()
+
     def activar(self) -> None:
         """Activa el servicio de notificaciones."""
         self.activo = True
@@ -144,6 +462,9 @@ class ServicioNotificaciones:
         """
         Envia notificacion cuando se realiza un prestamo.
         """
+        if not self._hay_suscriptores(TipoNotificacion.PRESTAMO_REALIZADO):
+            return False
+
         mensaje = f"Prestamo realizado a {usuario}"
         datos = {
             "usuario": usuario,
@@ -158,6 +479,9 @@ class ServicioNotificaciones:
         """
         Envia notificacion cuando se devuelve un libro.
         """
+        if not self._hay_suscriptores(TipoNotificacion.LIBRO_DEVUELTO):
+            return False
+
         mensaje = f"Libro '{titulo_libro}' devuelto por {usuario}"
         datos = {
             "usuario": usuario,
@@ -171,6 +495,9 @@ class ServicioNotificaciones:
         """
         Envia notificacion cuando se agrega un nuevo libro.
         """
+        if not self._hay_suscriptores(TipoNotificacion.LIBRO_AGREGADO):
+            return False
+
         mensaje = f"Nuevo libro agregado: '{titulo}' por {autor}"
         datos = {
             "titulo": titulo,
@@ -184,6 +511,9 @@ class ServicioNotificaciones:
         """
         Envia notificacion de error del sistema.
         """
+        if not self._hay_suscriptores(TipoNotificacion.ERROR_SISTEMA):
+            return False
+
         mensaje = f"Error en el sistema: {tipo_error}"
         datos = {
             "tipo_error": tipo_error,
@@ -197,6 +527,9 @@ class ServicioNotificaciones:
         """
         Envia notificacion cuando un libro vuelve a estar disponible.
         """
+        if not self._hay_suscriptores(TipoNotificacion.LIBRO_DISPONIBLE):
+            return False
+
         mensaje = f"Libro disponible: '{titulo}'"
         datos = {
             "libro": titulo,
@@ -205,6 +538,48 @@ class ServicioNotificaciones:
 
         return self._enviar_notificacion(mensaje, TipoNotificacion.LIBRO_DISPONIBLE, datos)
 
+    def notificar_recordatorio_devolucion(self, usuario: str, titulo_libro: str,
+                                          fecha_vencimiento: str) -> bool:
+        """
+        Envia recordatorio cuando vence el plazo de devolucion de un prestamo.
+        """
+        if not self._hay_suscriptores(TipoNotificacion.RECORDATORIO_DEVOLUCION):
+            return False
+
+        mensaje = f"Recordatorio: {usuario} debe devolver '{titulo_libro}'"
+        datos = {
+            "usuario": usuario,
+            "libro": titulo_libro,
+            "fecha_vencimiento": fecha_vencimiento,
+            "accion": "recordatorio"
+        }
+
+        return self._enviar_notificacion(mensaje, TipoNotificacion.RECORDATORIO_DEVOLUCION, datos)
+
+    def notificar_reserva_disponible(self, usuario: str, titulo_libro: str) -> bool:
+        """
+        Avisa solo al usuario que sigue en la cola de reservas que el libro
+        devuelto quedo apartado para el.
+        """
+        if not self._hay_suscriptores(TipoNotificacion.RESERVA_DISPONIBLE):
+            return False
+
+        mensaje = f"Reserva disponible: '{titulo_libro}' apartado para {usuario}"
+        datos = {
+            "usuario": usuario,
+            "libro": titulo_libro,
+            "accion": "reserva_disponible"
+        }
+
+        return self._enviar_notificacion(mensaje, TipoNotificacion.RESERVA_DISPONIBLE, datos)
+
+    def _hay_suscriptores(self, tipo: TipoNotificacion) -> bool:
+        """
+        Indica si algun canal recibiria el tipo de notificacion. Permite
+        omitir la construccion del mensaje y sus datos cuando nadie lo recibe.
+        """
+        return self.activo and any(canal.acepta(tipo) for canal in self.canales)
+
     def _enviar_notificacion(self, mensaje: str, tipo: TipoNotificacion, 
                            datos: Dict[str, Any] = None) -> bool:
         """
@@ -213,12 +588,80 @@ class ServicioNotificaciones:
         if not self.activo:
             return False
 
+        ahora = time.monotonic()
+        envios = []
+        with self._candado:
+            for canal in list(self.canales):
+                if not canal.acepta(tipo):
+                    continue
+                estado = self._estado_sin_candado(canal)
+                if not estado.permite_envio(ahora):
+                    estado.omitidos += 1
+                    continue
+                envios.append((canal, estado))
+
+        if not envios:
+            return False
+
+        encolado = time.monotonic()
+        futuros = [
+            (estado, self._trabajador(canal).enviar(mensaje, tipo, datos))
+            for canal, estado in envios
+        ]
+
         exitos = 0
-        for canal in self.canales:
-            try:
-                if canal.enviar(mensaje, tipo, datos):
-                    exitos += 1
-            except Exception as e:
-                print(f"Error en canal de notificacion: {e}")
+        for estado, envio in futuros:
+            exito, latencia, timeout = self._esperar_envio(envio, estado.timeout, encolado)
+            with self._candado:
+                estado.registrar(exito, latencia, timeout)
+            if exito:
+                exitos += 1
 
         return exitos > 0
+
+    @staticmethod
+    def _esperar_envio(envio: _Envio, timeout: float, encolado: float) -> tuple:
+        """
+        Espera el resultado de un envio hasta timeout segundos despues de
+        que el canal lo comenzo. Si el canal sigue ocupado con un envio
+        anterior, el envio nuevo se descarta tras esperar timeout en la cola.
+
+        Returns:
+            Tupla (exito, latencia, hubo_timeout)
+        """
+        if not envio.iniciado.wait(max(0.0, encolado + timeout - time.monotonic())):
+            if envio.futuro.cancel():
+                print(f"Timeout en canal de notificacion: ocupado mas de {timeout}s")
+                return False, timeout, True
+            envio.iniciado.wait()
+
+        try:
+            restante = max(0.0, envio.inicio + timeout - time.monotonic())
+            return (*envio.futuro.result(timeout=restante), False)
+        except FuturoTimeoutError:
+            print(f"Timeout en canal de notificacion tras {timeout}s")
+            return False, timeout, True
+
+    def _trabajador(self, canal: CanalNotificacion) -> _TrabajadorCanal:
+        """
+        Hilo del canal, creado en su primer envio.
+        """
+        with self._candado:
+            trabajador = self._trabajadores.get(id(canal))
+            if trabajador is None:
+                trabajador = self._trabajadores[id(canal)] = _TrabajadorCanal(canal)
+            return trabajador
+
+    def _estado(self, canal: CanalNotificacion) -> EstadoCanal:
+        """
+        Estado asociado a un canal, creado con la configuracion por defecto.
+        """
+        with self._candado:
+            return self._estado_sin_candado(canal)
+
+    def _estado_sin_candado(self, canal: CanalNotificacion) -> EstadoCanal:
+        estado = self._estados.get(id(canal))
+        if estado is None:
+            estado = self._estados[id(canal)] = EstadoCanal(
+                self.timeout_por_defecto, self.umbral_fallos, self.enfriamiento)
+        return estado
@@ -0,0 +1,65 @@
+"""
+PRUEBAS DE LA VISTA DE PRESTAMOS ACTIVOS
+"""
+
+from archivo_prestamos import ArchivoPrestamos
+from benchmark_biblioteca import generar_isbn13
+from biblioteca import SistemaBiblioteca
+from busqueda import Busqueda
+from repositorio_memoria import RepositorioMemoria
+from servicio_notificaciones import ServicioNotificaciones
+from validador_biblioteca import ValidadorBiblioteca
+
+
+def _sistema_con_prestamos(cantidad, archivo_prestamos=None):
+    """
+    Sistema en memoria con cantidad de libros prestados.
+    """
+    notificaciones = ServicioNotificaciones()
+    notificaciones.desactivar()
+    sistema = SistemaBiblioteca(
+        busqueda=Busqueda(),
+        validador=ValidadorBiblioteca(),
+        repositorio=RepositorioMemoria(),
+        notificaciones=notificaciones,
+        archivo_prestamos=archivo_prestamos
+    )
+    for numero in range(cantidad):
+        sistema.agregar_libro(f"Libro {numero}", "Autor", generar_isbn13(numero))
+        sistema.realizar_prestamo(numero + 1, f"usuario{numero}")
+    return sistema
+
+
+def test_devolver_mientras_se_itera():
+    sistema = _sistema_con_prestamos(5)
+
+    for prestamo in sistema.obtener_prestamos_activos():
+        assert sistema.devolver_libro(prestamo.id) == "Libro devuelto exitosamente"
+
+    assert len(sistema.obtener_prestamos_activos()) == 0
+
+
+def test_devolver_y_archivar_mientras_se_itera(tmp_path):
+    sistema = _sistema_con_prestamos(5, ArchivoPrestamos(str(tmp_path / "historial")))
+
+    devueltos = []
+    for prestamo in sistema.obtener_prestamos_activos():
+        assert sistema.devolver_libro(prestamo.id) == "Libro devuelto exitosamente"
+        devueltos.append(prestamo.id)
+
+    assert devueltos == [1, 2, 3, 4, 5]
+    assert len(sistema.obtener_prestamos_activos()) == 0
+
+
+def test_prestar_mientras_se_itera():
+    sistema = _sistema_con_prestamos(3)
+    sistema.agregar_libro("Extra", "Autor", generar_isbn13(99))
+
+    vistos = []
+    for prestamo in sistema.obtener_prestamos_activos():
+        if not vistos:
+            assert sistema.realizar_prestamo(4, "otro").startswith("Prestamo realizado")
+        vistos.append(prestamo.id)
+
+    assert vistos == [1, 2, 3]
+    assert len(sistema.obtener_prestamos_activos()) == 4
@@ -0,0 +1,71 @@
+"""
+USUARIOS Y LIMITES DE PRESTAMO
+"""
+
+from typing import Dict, List
+
+
+class Usuario:
+    """
+    Usuario de la biblioteca con el limite de prestamos por defecto.
+    """
+    def __init__(self, nombre: str):
+        """
+        Args:
+            nombre: Nombre con el que el usuario pide prestamos
+        """
+        self.nombre = nombre
+
+    def calcular_limite_prestamos(self) -> int:
+        """Cantidad maxima de prestamos activos simultaneos."""
+        return 3
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.nombre!r})"
+
+
+class Estudiante(Usuario):
+    """
+    Estudiante: mismo limite que cualquier usuario.
+    """
+    def calcular_limite_prestamos(self) -> int:
+        return 3
+
+
+class Profesor(Usuario):
+    """
+    Profesor: puede tener mas libros a la vez.
+    """
+    def calcular_limite_prestamos(self) -> int:
+        return 10
+
+
+class RegistroUsuarios:
+    """
+    Usuarios registrados por nombre. Quien no esta registrado se trata como
+    Usuario basico, por lo que pedir prestado no exige registro previo.
+    """
+    def __init__(self):
+        """
+        Inicializa el registro vacio.
+        """
+        self._usuarios: Dict[str, Usuario] = {}
+
+    def __len__(self) -> int:
+        return len(self._usuarios)
+
+    def registrar(self, usuario: Usuario) -> None:
+        """
+        Registra o reemplaza un usuario.
+        """
+        self._usuarios[usuario.nombre] = usuario
+
+    def obtener(self, nombre: str) -> Usuario:
+        """
+        Usuario registrado con ese nombre, o un Usuario basico.
+        """
+        return self._usuarios.get(nombre) or Usuario(nombre)
+
+    def obtener_todos(self) -> List[Usuario]:
+        """Usuarios registrados."""
+        return list(self._usuarios.values())
@@ -2,7 +2,52 @@
 VALIDADOR BIBLIOTECA
 """
 
-from typing import Tuple
+import operator
+import re
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from normalizacion import normalizar_isbn
+
+_ISBN_ALFANUMERICO = re.compile(r"[0-9A-Za-z]+")
+_ISBN_10 = re.compile(r"[0-9]{9}[0-9X]")
+_ISBN_13 = re.compile(r"[0-9]{13}")
+_PESOS_ISBN_10 = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+_PESOS_ISBN_13 = (1, 3) * 6 + (1,)
+
+FilaLibro = Union[Mapping[str, Any], Sequence[Any]]
+
+
+def _error_texto(valor: Any, campo: str, minimo: int) -> Optional[str]:
+    """
+    Primer error de un campo de texto obligatorio, o None si es valido.
+    """
+    if not valor or not isinstance(valor, str):
+        return f"Error: {campo} invalido - debe ser una cadena no vacia"
+
+    if len(valor.strip()) < minimo:
+        return f"Error: {campo} invalido - debe tener al menos {minimo} caracteres"
+
+    return None
+
+
+def _error_isbn(isbn: Any) -> Optional[str]:
+    """
+    Primer error del ISBN, o None si es valido.
+    """
+    if not isbn or not isinstance(isbn, str):
+        return "Error: ISBN invalido - debe ser una cadena no vacia"
+
+    if len(isbn.strip()) < 10:
+        return "Error: ISBN invalido - debe tener al menos 10 caracteres"
+
+    isbn_limpio = normalizar_isbn(isbn)
+    if not _ISBN_ALFANUMERICO.fullmatch(isbn_limpio):
+        return "Error: ISBN invalido - solo debe contener numeros, letras y guiones"
+
+    if not ValidadorBiblioteca.validar_checksum_isbn(isbn_limpio):
+        return "Error: ISBN invalido - no es un ISBN-10 o ISBN-13 con digito de control correcto"
+
+    return None
+
 
 class ValidadorBiblioteca:
     """
@@ -13,29 +58,68 @@ class ValidadorBiblioteca:
         """
         Valida los datos de un libro antes de agregarlo al sistema.
         """
-        if not titulo or not isinstance(titulo, str):
-            return False, "Error: Titulo invalido - debe ser una cadena no vacia"
+        errores = ValidadorBiblioteca.errores_libro(titulo, autor, isbn)
+        if errores:
+            return False, errores[0]
+
+        return True, "Datos del libro validos"
+
+    @staticmethod
+    def errores_libro(titulo: str, autor: str, isbn: str) -> List[str]:
+        """
+        Retorna todos los errores de un libro: como maximo uno por campo,
+        en el orden titulo, autor, ISBN. Una lista vacia indica datos validos.
+        """
+        errores = []
+        for error in (_error_texto(titulo, "Titulo", 2),
+                      _error_texto(autor, "Autor", 3),
+                      _error_isbn(isbn)):
+            if error:
+                errores.append(error)
+        return errores
 
-        if len(titulo.strip()) < 2:
-            return False, "Error: Titulo invalido - debe tener al menos 2 caracteres"
+    @staticmethod
+    def validar_lote(filas: Iterable[FilaLibro]) -> Iterator[Tuple[int, List[str]]]:
+        """
+        Valida una secuencia o flujo de libros candidatos en una sola pasada.
 
-        if not autor or not isinstance(autor, str):
-            return False, "Error: Autor invalido - debe ser una cadena no vacia"
+        Args:
+            filas: Diccionarios con claves "titulo", "autor" e "isbn", o
+                   tuplas (titulo, autor, isbn)
 
-        if len(autor.strip()) < 3:
-            return False, "Error: Autor invalido - debe tener al menos 3 caracteres"
+        Returns:
+            Iterador de (indice_fila, errores) para cada fila, en orden; la
+            lista de errores esta vacia si la fila es valida. Al ser perezoso,
+            no retiene las filas ya validadas.
+        """
+        errores_libro = ValidadorBiblioteca.errores_libro
+        for indice, fila in enumerate(filas):
+            if isinstance(fila, Mapping):
+                errores = errores_libro(fila.get("titulo"), fila.get("autor"), fila.get("isbn"))
+            elif len(fila) == 3:
+                errores = errores_libro(*fila)
+            else:
+                errores = ["Error: Fila invalida - se esperaban titulo, autor e isbn"]
+            yield indice, errores
 
-        if not isbn or not isinstance(isbn, str):
-            return False, "Error: ISBN invalido - debe ser una cadena no vacia"
+    @staticmethod
+    def validar_checksum_isbn(isbn_limpio: str) -> bool:
+        """
+        Verifica el digito de control de un ISBN ya normalizado.
 
-        if len(isbn.strip()) < 10:
-            return False, "Error: ISBN invalido - debe tener al menos 10 caracteres"
+        ISBN-10: suma ponderada 10..1 multiplo de 11 (la "X" final vale 10).
+        ISBN-13: suma ponderada alternando 1 y 3 multiplo de 10.
+        """
+        if _ISBN_10.fullmatch(isbn_limpio):
+            control = 10 if isbn_limpio[9] == "X" else int(isbn_limpio[9])
+            suma = sum(map(operator.mul, _PESOS_ISBN_10, map(int, isbn_limpio[:9]))) + control
+            return suma % 11 == 0
 
-        isbn_limpio = isbn.replace('-', '').replace(' ', '')
-        if not isbn_limpio.isalnum():
-            return False, "Error: ISBN invalido - solo debe contener numeros, letras y guiones"
+        if _ISBN_13.fullmatch(isbn_limpio):
+            suma = sum(map(operator.mul, _PESOS_ISBN_13, map(int, isbn_limpio)))
+            return suma % 10 == 0
 
-        return True, "Datos del libro validos"
+        return False
 
     @staticmethod
     def validar_usuario(usuario: str) -> Tuple[bool, str]:
@@ -0,0 +1,150 @@
+"""
+VERIFICACION DE ESCRITURAS CONCURRENTES
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import List
+from benchmark_biblioteca import generar_isbn13
+
+
+def _nuevo_sistema(ruta: str):
+    """
+    Sistema sobre el repositorio compartido, sin notificaciones.
+    """
+    from biblioteca import SistemaBiblioteca
+    from busqueda import Busqueda
+    from validador_biblioteca import ValidadorBiblioteca
+    from servicio_notificaciones import ServicioNotificaciones
+    from repositorio_compartido import RepositorioArchivoCompartido
+
+    notificaciones = ServicioNotificaciones()
+    notificaciones.desactivar()
+    return SistemaBiblioteca(
+        busqueda=Busqueda(),
+        validador=ValidadorBiblioteca(),
+        repositorio=RepositorioArchivoCompartido(ruta),
+        notificaciones=notificaciones
+    )
+
+
+def _trabajar(ruta: str, proceso: int, libros: int, errores) -> None:
+    """
+    Agrega libros y presta y devuelve cada uno, intercalado con los demas
+    procesos. Cada resultado inesperado se reporta en errores.
+    """
+    sistema = _nuevo_sistema(ruta)
+    usuario = f"usuario{proceso}"
+    for i in range(libros):
+        isbn = generar_isbn13(proceso * libros + i)
+        resultado = sistema.agregar_libro(f"Libro {proceso}-{i}", f"Autor {proceso}", isbn)
+        if "exitosamente" not in resultado:
+            errores.append(f"Proceso {proceso}: {resultado}")
+            continue
+
+        encontrados = sistema.buscar_libro("isbn", isbn)
+        if len(encontrados) != 1:
+            errores.append(f"Proceso {proceso}: ISBN {isbn} encontrado {len(encontrados)} veces")
+            continue
+
+        libro_id = encontrados[0].id
+        resultado = sistema.realizar_prestamo(libro_id, usuario)
+        if not resultado.startswith("Prestamo realizado"):
+            errores.append(f"Proceso {proceso}: {resultado}")
+            continue
+
+        prestamo = next(p for p in sistema.obtener_prestamos_activos() if p.libro_id == libro_id)
+        resultado = sistema.devolver_libro(prestamo.id)
+        if resultado != "Libro devuelto exitosamente":
+            errores.append(f"Proceso {proceso}: {resultado}")
+
+    sistema.cerrar()
+    sistema.repositorio.cerrar()
+
+
+def verificar(ruta: str, procesos: int = 4, libros: int = 60) -> List[str]:
+    """
+    Lanza procesos que escriben a la vez sobre el mismo archivo y comprueba
+    que no se pierda ni duplique ninguna escritura.
+
+    Returns:
+        Lista de errores; vacia si la verificacion paso
+    """
+    for sufijo in ("", ".lock", ".indices", ".cambios"):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Manager() as gestor:
+        errores = gestor.list()
+        trabajadores = [
+            contexto.Process(target=_trabajar, args=(ruta, proceso, libros, errores))
+            for proceso in range(procesos)
+        ]
+        for trabajador in trabajadores:
+            trabajador.start()
+        for trabajador in trabajadores:
+            trabajador.join()
+            if trabajador.exitcode != 0:
+                errores.append(f"Un proceso termino con codigo {trabajador.exitcode}")
+        errores = list(errores)
+
+    total = procesos * libros
+    sistema = _nuevo_sistema(ruta)
+    ids = sorted(libro.id for libro in sistema.libros)
+    if ids != list(range(1, total + 1)):
+        errores.append(f"Se esperaban los libros 1..{total} y hay {len(ids)} con IDs {ids[:5]}...")
+
+    isbns = {libro.isbn for libro in sistema.libros}
+    faltantes = [numero for numero in range(total) if generar_isbn13(numero) not in isbns]
+    if faltantes:
+        errores.append(f"Faltan {len(faltantes)} libros, por ejemplo el numero {faltantes[0]}")
+
+    prestamos = list(sistema.prestamos)
+    if len(prestamos) != total or any(not prestamo.devuelto for prestamo in prestamos):
+        activos = sum(1 for prestamo in prestamos if not prestamo.devuelto)
+        errores.append(f"Se esperaban {total} prestamos devueltos y hay {len(prestamos)} ({activos} activos)")
+
+    if any(not libro.disponible for libro in sistema.libros):
+        errores.append("Hay libros devueltos que siguen marcados como no disponibles")
+
+    if sistema.contador_libro != total + 1 or sistema.contador_prestamo != total + 1:
+        errores.append(f"Contadores inesperados: libro {sistema.contador_libro}, "
+                       f"prestamo {sistema.contador_prestamo}")
+
+    sistema.repositorio.cerrar()
+    return errores
+
+
+def main():
+    """
+    Ejecuta la verificacion y termina con codigo 1 si encontro errores.
+    """
+    parser = argparse.ArgumentParser(
+        description="Verifica que RepositorioArchivoCompartido no pierda escrituras concurrentes.")
+    parser.add_argument("--procesos", type=int, default=4)
+    parser.add_argument("--libros", type=int, default=60, help="Libros por proceso")
+    parser.add_argument("--archivo", help="Archivo de datos; por defecto uno temporal")
+    opciones = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = opciones.archivo or os.path.join(directorio, "biblioteca.json")
+        inicio = time.monotonic()
+        errores = verificar(ruta, opciones.procesos, opciones.libros)
+        duracion = time.monotonic() - inicio
+
+    operaciones = opciones.procesos * opciones.libros * 3
+    print(f"{opciones.procesos} procesos, {operaciones} escrituras en {duracion:.1f} s")
+    if errores:
+        for error in errores:
+            print(f"- {error}")
+        sys.exit(1)
+    print("OK: ninguna escritura perdida ni duplicada")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+VISTAS DE SOLO LECTURA
+"""
+
+import itertools
+from collections.abc import Sequence
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+
+class VistaSoloLectura(Sequence):
+    """
+    Secuencia de solo lectura sobre una lista interna, sin copiarla.
+
+    Admite indices, recortes e iteracion; un recorte es otra vista sobre la
+    misma lista, por lo que tampoco copia elementos. La vista completa sigue
+    a la lista (refleja elementos agregados despues); un recorte queda fijo
+    en las posiciones que tenia la lista al crearlo.
+    """
+    def __init__(self, lista: List[Any], rango: Optional[range] = None):
+        """
+        Args:
+            lista: Lista interna a exponer
+            rango: Posiciones visibles; None expone la lista completa
+        """
+        self._lista = lista
+        self._rango = rango
+
+    def _posiciones(self) -> range:
+        return self._rango if self._rango is not None else range(len(self._lista))
+
+    def __len__(self) -> int:
+        return len(self._posiciones())
+
+    def __getitem__(self, indice):
+        posiciones = self._posiciones()
+        if isinstance(indice, slice):
+            return VistaSoloLectura(self._lista, posiciones[indice])
+        return self._lista[posiciones[indice]]
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._rango is None:
+            return iter(self._lista)
+        return (self._lista[i] for i in self._rango)
+
+    def __repr__(self) -> str:
+        return f"VistaSoloLectura({len(self)} elementos)"
+
+
+class VistaFiltrada:
+    """
+    Vista perezosa de solo lectura de los elementos de una lista que
+    cumplen un filtro.
+
+    No guarda resultados: cada iteracion vuelve a recorrer la lista, asi que
+    siempre refleja el estado actual. Los recortes con inicio, fin y paso no
+    negativos se resuelven sin conocer la longitud; len() y los indices
+    negativos requieren recorrer la lista completa.
+
+    Con instantanea=True cada iteracion recorre una copia de la coleccion
+    tomada al empezar, de modo que se pueden agregar o quitar elementos
+    mientras se itera (por ejemplo, devolver cada prestamo activo).
+    """
+    def __init__(self, lista: Iterable[Any], filtro: Callable[[Any], bool],
+                 recorte: Optional[slice] = None, instantanea: bool = False):
+        """
+        Args:
+            lista: Coleccion interna a recorrer
+            filtro: Condicion que deben cumplir los elementos visibles
+            recorte: Recorte aplicado sobre los elementos que cumplen el filtro
+            instantanea: Si cada iteracion recorre una copia de la coleccion
+        """
+        self._lista = lista
+        self._filtro = filtro
+        self._recorte = recorte
+        self._instantanea = instantanea
+
+    def __iter__(self) -> Iterator[Any]:
+        lista = tuple(self._lista) if self._instantanea else self._lista
+        elementos = filter(self._filtro, lista)
+        if self._recorte is None:
+            return elementos
+        return itertools.islice(elementos, self._recorte.start, self._recorte.stop, self._recorte.step)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return next(iter(self), None) is not None
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return VistaFiltrada(self, lambda _: True, self._normalizar_recorte(indice))
+
+        if indice < 0:
+            indice += len(self)
+        if indice >= 0:
+            for elemento in itertools.islice(self, indice, None):
+                return elemento
+        raise IndexError("indice fuera de rango")
+
+    def _normalizar_recorte(self, recorte: slice) -> slice:
+        """
+        Convierte el recorte a uno sin valores negativos, calculando la
+        longitud solo si hace falta.
+        """
+        if recorte.step is not None and recorte.step < 1:
+            raise ValueError("Las vistas filtradas solo admiten paso positivo")
+        if any(valor is not None and valor < 0 for valor in (recorte.start, recorte.stop)):
+            return slice(*recorte.indices(len(self)))
+        return recorte
+
+    def __repr__(self) -> str:
+        return "VistaFiltrada()"